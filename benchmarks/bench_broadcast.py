@@ -0,0 +1,169 @@
+"""CPU and memory of N viewers: N separate dashboard processes vs one broadcast with N watchers.
+
+The dashboard polls psutil four times a second, like a typical generated one. Separate mode runs
+N copies on their own pseudo-terminals; broadcast mode runs one copy under a Broadcaster plus N
+`hacker-dash watch` clients. Reports CPU time and resident memory summed over every process
+involved (dashboards, the broadcast host and the watchers; not this script's own pty reading).
+
+Usage: python benchmarks/bench_broadcast.py [--viewers 1 4 8] [--seconds 10] [--out results.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import psutil
+
+from hacker_dash import executor
+
+DASHBOARD = '''
+import psutil
+from textual.app import App
+from textual.widgets import Static
+
+
+class Dashboard(App):
+    def compose(self):
+        for name in ("cpu", "memory", "disk", "net"):
+            yield Static(id=name)
+
+    def on_mount(self):
+        self.set_interval(0.25, self.sample)
+
+    def sample(self):
+        net = psutil.net_io_counters()
+        self.query_one("#cpu", Static).update(f"CPU {psutil.cpu_percent():5.1f}%")
+        self.query_one("#memory", Static).update(f"MEM {psutil.virtual_memory().percent:5.1f}%")
+        self.query_one("#disk", Static).update(f"DISK {psutil.disk_usage('/').percent:5.1f}%")
+        self.query_one("#net", Static).update(f"NET {net.bytes_sent + net.bytes_recv:,}")
+
+
+Dashboard().run()
+'''
+
+HOST = '''
+import sys
+from pathlib import Path
+from hacker_dash import broadcast
+
+with broadcast.Broadcaster(Path(sys.argv[1])) as host:
+    host.run([sys.executable, sys.argv[2]])
+'''
+
+
+def drain(fd: int):
+    """Stand in for a terminal: read and discard the pty output."""
+    try:
+        while os.read(fd, 65536):
+            pass
+    except OSError:
+        pass
+
+
+def spawn_viewer(cmd: list[str]) -> int:
+    pid, master = executor.spawn_in_pty(cmd)
+    threading.Thread(target=drain, args=(master,), daemon=True).start()
+    return pid
+
+
+def tree(pids: list[int]) -> list[psutil.Process]:
+    processes = []
+    for pid in pids:
+        try:
+            process = psutil.Process(pid)
+            processes += [process, *process.children(recursive=True)]
+        except psutil.NoSuchProcess:
+            pass
+    return processes
+
+
+def measure(pids: list[int], seconds: float) -> dict:
+    time.sleep(2)  # Startup (imports, first render) isn't steady-state cost
+    processes = tree(pids)
+    before = {process.pid: sum(process.cpu_times()[:2]) for process in processes}
+    time.sleep(seconds)
+    cpu = 0.0
+    rss = 0
+    for process in processes:
+        try:
+            cpu += sum(process.cpu_times()[:2]) - before[process.pid]
+            rss += process.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return {"cpu_percent": round(100 * cpu / seconds, 1), "rss_mb": round(rss / 2**20, 1),
+            "processes": len(processes)}
+
+
+def stop(pids: list[int]):
+    for process in tree(pids):
+        try:
+            process.terminate()
+        except psutil.NoSuchProcess:
+            pass
+    for pid in pids:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+
+
+def run_separate(script: Path, viewers: int, seconds: float) -> dict:
+    pids = [spawn_viewer([sys.executable, str(script)]) for _ in range(viewers)]
+    try:
+        return measure(pids, seconds)
+    finally:
+        stop(pids)
+
+
+def run_broadcast(script: Path, host: Path, socket_path: Path, viewers: int, seconds: float) -> dict:
+    host_process = subprocess.Popen([sys.executable, str(host), str(socket_path), str(script)])
+    deadline = time.monotonic() + 10
+    while not socket_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    pids = [spawn_viewer(["hacker-dash", "watch"]) for _ in range(viewers)]
+    try:
+        return measure([host_process.pid, *pids], seconds)
+    finally:
+        stop(pids)
+        host_process.terminate()
+        host_process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--viewers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--out", type=Path, help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        script = tmp / "dashboard.py"
+        script.write_text(DASHBOARD)
+        host = tmp / "host.py"
+        host.write_text(HOST)
+        # watch connects to the default socket, so point the cache dir (and the socket) into tmp
+        os.environ["XDG_CACHE_HOME"] = str(tmp)
+        socket_path = Path(subprocess.run(
+            [sys.executable, "-c", "from hacker_dash import broadcast; print(broadcast.SOCKET_PATH)"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip())
+
+        results = {"config": {"seconds": args.seconds}, "separate": {}, "broadcast": {}}
+        for viewers in args.viewers:
+            results["separate"][viewers] = run_separate(script, viewers, args.seconds)
+            results["broadcast"][viewers] = run_broadcast(script, host, socket_path, viewers, args.seconds)
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.out:
+        args.out.write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Launch-to-first-frame latency: cold `uv run` vs a warm pooled interpreter.
+
+Usage: python benchmarks/bench_envpool.py [runs]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from hacker_dash import envpool
+
+# Exits as soon as the first frame has been rendered
+FIRST_FRAME_APP = '''# /// script
+# dependencies = ["textual", "psutil"]
+# ///
+from textual.app import App
+from textual.widgets import Static
+
+class FirstFrame(App):
+    def compose(self):
+        yield Static("first frame")
+
+    def on_ready(self):
+        self.exit()
+
+if __name__ == "__main__":
+    FirstFrame().run(headless=True)
+'''
+
+
+def time_launch(cmd: list[str], env: dict = None) -> float:
+    start = time.perf_counter()
+    subprocess.run(cmd, check=True, capture_output=True, env=env)
+    return time.perf_counter() - start
+
+
+def main(runs: int = 5):
+    with tempfile.TemporaryDirectory() as tmp:
+        script = Path(tmp) / "first_frame.py"
+        script.write_text(FIRST_FRAME_APP)
+
+        # A throwaway uv cache forces a full resolve and install, like a first-ever launch
+        cold_env = {**os.environ, "UV_CACHE_DIR": str(Path(tmp) / "uv-cache")}
+        cold = time_launch(["uv", "run", str(script)], env=cold_env)
+
+        uv_cached = [time_launch(["uv", "run", str(script)]) for _ in range(runs)]
+
+        cmd = envpool.command(script, FIRST_FRAME_APP)
+        pooled = [time_launch(cmd) for _ in range(runs)]
+
+    print(f"cold uv run (empty cache): {cold:.3f}s")
+    print(f"uv run (warm uv cache):    {min(uv_cached):.3f}s best / {sum(uv_cached) / runs:.3f}s mean")
+    print(f"warm env pool:             {min(pooled):.3f}s best / {sum(pooled) / runs:.3f}s mean")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,122 @@
+"""Tail latency with and without hedged requests, using local stub providers.
+
+The primary stub is usually fast but occasionally stalls (an overloaded endpoint); the backup
+is slower on average but steady. Each request goes through providers.hedged() exactly as
+brain does, with the hedge delay taken from the primary's observed p95. Reports latency
+percentiles, how often the hedge fired and won, and checks every call returned the winner's text.
+
+Usage: python benchmarks/bench_hedging.py [--requests 300] [--stall-rate 0.03] [--out results.json]
+"""
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+from pathlib import Path
+
+from hacker_dash import providers
+
+
+class StubProvider(providers.Provider):
+    """Scripted latency: `latency()` seconds, streamed as ten chunks so cancellation is observed."""
+
+    name = "stub"
+
+    def __init__(self, model: str, latency):
+        super().__init__(model)
+        self.latency = latency
+        self.calls = 0
+        self.cancelled = 0
+        self.lock = threading.Lock()
+
+    def stream(self, request, cancelled, on_text=None):
+        with self.lock:
+            self.calls += 1
+        delay = self.latency()
+        for i in range(10):
+            time.sleep(delay / 10)
+            if cancelled.is_set():
+                with self.lock:
+                    self.cancelled += 1
+                return providers.Completion("", 100, i * 10, cancelled=True)
+            if on_text:
+                on_text((i + 1) * 10)
+        return providers.Completion(f"{self.model}:{request.user}", 100, 100)
+
+
+def percentile(values: list, q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run_mode(args, chain, hedge_after) -> tuple[dict, list]:
+    latencies = []
+    hedge_wins = 0
+    correct = 0
+    backup_calls = sum(provider.calls for provider in chain[1:])
+
+    for i in range(args.requests):
+        start = time.perf_counter()
+        winner = providers.hedged(chain, providers.Request("system", str(i), 100), hedge_after)
+        latencies.append(time.perf_counter() - start)
+        correct += winner.completion.text == f"{winner.provider.model}:{i}"
+        hedge_wins += winner.hedge
+
+    hedges = sum(provider.calls for provider in chain[1:]) - backup_calls
+    return {
+        "p50": round(statistics.median(latencies), 4),
+        "p95": round(percentile(latencies, 0.95), 4),
+        "p99": round(percentile(latencies, 0.99), 4),
+        "max": round(max(latencies), 4),
+        "hedge_rate": round(hedges / args.requests, 3),
+        "hedge_win_rate": round(hedge_wins / args.requests, 3),
+        "correct": correct == args.requests,
+    }, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--stall-rate", type=float, default=0.03, help="Fraction of primary requests that stall")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    lock = threading.Lock()
+
+    def primary_latency():
+        with lock:
+            stalled = rng.random() < args.stall_rate
+            return rng.uniform(0.4, 0.6) if stalled else rng.uniform(0.04, 0.06)
+
+    def backup_latency():
+        with lock:
+            return rng.uniform(0.07, 0.09)
+
+    primary = StubProvider("primary", primary_latency)
+    backup = StubProvider("backup", backup_latency)
+
+    # The primary-only run doubles as the latency history brain would have recorded
+    primary_only, observed = run_mode(args, [primary], None)
+    hedge_after = percentile(observed, 0.95)
+    hedged, _ = run_mode(args, [primary, backup], hedge_after)
+
+    results = {
+        "config": {"requests": args.requests, "stall_rate": args.stall_rate, "hedge_after": round(hedge_after, 4)},
+        "primary_only": primary_only,
+        "hedged": hedged,
+    }
+    # Give the last losers a moment to notice their cancellation
+    time.sleep(0.1)
+    results["cancelled_losers"] = primary.cancelled + backup.cancelled
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.out:
+        args.out.write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Stats panel injection over a corpus of generated-code shapes: success rate and time per script.
+
+Usage: python benchmarks/bench_injector.py [iterations] [extra_script.py ...]
+"""
+import sys
+import time
+from pathlib import Path
+
+from hacker_dash import injector
+
+HEADER = '# /// script\n# dependencies = ["textual", "psutil"]\n# ///\n'
+
+# Shapes that broke the old regex injector
+CORPUS = {
+    "single_line_imports": HEADER + '''from textual.app import App
+from textual.widgets import Header, Footer
+
+class Dashboard(App):
+    def compose(self):
+        yield Header()
+        yield Footer()
+
+if __name__ == "__main__":
+    Dashboard().run()
+''',
+    "parenthesized_imports": HEADER + '''from textual.app import App, ComposeResult
+from textual.widgets import (
+    Header,
+    Footer,
+    Label,
+)
+
+class Dashboard(App):
+    def compose(self) -> ComposeResult:
+        yield Header()
+        yield Label("hi")
+''',
+    "compose_result_no_header": HEADER + '''from textual.app import App, ComposeResult
+from textual.containers import Vertical
+from textual.widgets import Label
+
+class Dashboard(App):
+    def compose(self) -> ComposeResult:
+        """Build the layout."""
+        with Vertical():
+            yield Label("cpu")
+''',
+    "multiple_app_subclasses": HEADER + '''from textual.app import App
+from textual.widgets import Static, Footer
+
+class BaseDash(App):
+    def compose(self):
+        yield Footer()
+
+class NeonDash(BaseDash):
+    def compose(self):
+        yield Static("neon")
+        yield Footer()
+
+if __name__ == "__main__":
+    NeonDash().run()
+''',
+    "no_widget_imports": HEADER + '''import textual.app
+
+class Dashboard(textual.app.App):
+    pass
+''',
+    "subscripted_app_base": HEADER + '''from textual.app import App, ComposeResult
+from textual.widgets import Header, Label
+
+class Dashboard(App[None]):
+    def compose(self) -> ComposeResult:
+        yield Header()
+        yield Label("cpu")
+
+if __name__ == "__main__":
+    Dashboard().run()
+''',
+}
+
+
+def injected_correctly(code: str) -> bool:
+    try:
+        compile(code, "<injected>", "exec")
+    except SyntaxError:
+        return False
+    return code.count("class StatsPanel(") == 1 and code.count("yield StatsPanel()") == 1
+
+
+def main(iterations: int = 200, extra: list[str] = ()):
+    corpus = dict(CORPUS)
+    for path in extra:
+        corpus[Path(path).name] = Path(path).read_text()
+
+    passed = 0
+    print(f"{'case':<28} {'ok':<4} {'µs/inject':>10}")
+    for name, code in corpus.items():
+        new_code, injected = injector.inject_stats_panel(code)
+        # Injecting twice (as healed code is) must not duplicate the panel
+        ok = injected and injected_correctly(injector.inject_stats_panel(new_code)[0])
+        passed += ok
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            injector.inject_stats_panel(code)
+        per_call = (time.perf_counter() - start) / iterations * 1e6
+        print(f"{name:<28} {'yes' if ok else 'NO':<4} {per_call:>10.0f}")
+
+    print(f"\n{passed}/{len(corpus)} injected correctly")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200, sys.argv[2:])
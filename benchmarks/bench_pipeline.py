@@ -0,0 +1,130 @@
+"""Offline end-to-end timing of the generate → inject → launch → crash → heal → relaunch pipeline.
+
+The Anthropic client is pointed at benchmarks/mock_server.py, so no network or API key is
+needed and model latency is fixed. What remains is hacker-dash's own overhead, reported per
+stage as JSON.
+
+Usage: python benchmarks/bench_pipeline.py [--ttft 0.2] [--tps 200] [--no-launch] [--out results.json]
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import mock_server  # noqa: E402
+
+
+class Timer:
+    def __init__(self):
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round(self.stages.get(name, 0) + time.perf_counter() - start, 6)
+
+
+@contextlib.contextmanager
+def quiet_stdout():
+    """Send the relayed dashboard output to /dev/null so only the JSON lands on stdout."""
+    saved = os.dup(1)
+    with open(os.devnull, "w") as devnull:
+        os.dup2(devnull.fileno(), 1)
+        try:
+            yield
+        finally:
+            os.dup2(saved, 1)
+            os.close(saved)
+
+
+def run(args) -> dict:
+    config = mock_server.MockConfig(ttft=args.ttft, tokens_per_second=args.tps)
+    server, url = mock_server.start(config)
+    os.environ["ANTHROPIC_BASE_URL"] = url
+
+    from hacker_dash import brain, cache, envpool, executor, healer, injector, stats, validator
+
+    # Keep benchmark records out of the user's real stats and cache
+    tmp = Path(tempfile.mkdtemp(prefix="hacker-dash-bench-"))
+    stats.STATS_DB = tmp / "stats.db"
+    stats.LIVE_FILE = tmp / "stats.live.json"
+    stats.LEGACY_STATS_FILE = tmp / "stats.json"
+    cache.CACHE_DIR = tmp / "cache"
+
+    timer = Timer()
+    start = time.perf_counter()
+
+    with timer.stage("generate"):
+        code = brain.generate_dashboard("mock-key", "monitor system resources", use_cache=False)
+
+    exit_codes = []
+    for attempt in range(2):
+        suffix = "" if attempt == 0 else "_relaunch"
+        with timer.stage("inject" + suffix):
+            code, _ = injector.inject_stats_panel(code)
+        with timer.stage("write" + suffix):
+            script = tmp / f"attempt{attempt}.py"
+            script.write_text(code)
+        with timer.stage("validate" + suffix):
+            validator.validate(code)
+
+        if args.no_launch:
+            error = "RuntimeError: sensor offline" if attempt == 0 else None
+        else:
+            with timer.stage("env_acquire" + suffix):
+                cmd = envpool.command(script, code)
+            with timer.stage("launch" + suffix), quiet_stdout():
+                result = executor.launch(cmd)
+            exit_codes.append(result.returncode)
+            error = result.stderr if result.returncode else None
+
+        if error is None:
+            break
+
+        with timer.stage("local_heal"):
+            healed = healer.heal(code, error)
+        with timer.stage("fix_dashboard"):
+            code = healed[0] if healed else brain.fix_dashboard("mock-key", code, error)
+
+    total = time.perf_counter() - start
+    server.shutdown()
+
+    model_time = {
+        "generate": args.ttft + len(config.generate_code) / 4 / args.tps,
+        "fix_dashboard": args.ttft + len(config.patch_response) / 4 / args.tps,
+    }
+    return {
+        "config": {"ttft": args.ttft, "tokens_per_second": args.tps, "launch": not args.no_launch},
+        "stages": timer.stages,
+        "total": round(total, 6),
+        # Everything that isn't simulated model time is hacker-dash's own overhead
+        "overhead": round(total - sum(model_time.values()), 6),
+        "exit_codes": exit_codes,
+        "api_requests": len(config.requests),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ttft", type=float, default=0.2, help="Simulated time to first token (s)")
+    parser.add_argument("--tps", type=float, default=200.0, help="Simulated output tokens per second")
+    parser.add_argument("--no-launch", action="store_true", help="Skip uv/env launches (fully offline)")
+    parser.add_argument("--out", type=Path, help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = json.dumps(run(args), indent=2)
+    print(results)
+    if args.out:
+        args.out.write_text(results + "\n")
+
+
+if __name__ == "__main__":
+    main()
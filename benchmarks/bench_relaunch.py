@@ -0,0 +1,88 @@
+"""Time-to-relaunch: a fresh dashboard process per attempt vs one warm supervisor.
+
+Each run launches a dashboard that imports psutil, mounts a few widgets and exits as soon as it
+is ready, so the time measured is what a heal attempt spends getting the fixed App on screen.
+Both modes use the pooled environment and Textual's headless driver (no terminal needed).
+The supervisor's one-off start is reported separately from its per-run cost.
+
+Usage: python benchmarks/bench_relaunch.py [--runs 10] [--out results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from hacker_dash import envpool, supervisor
+
+DASHBOARD = '''
+import psutil
+from textual.app import App
+from textual.containers import Grid
+from textual.widgets import Footer, Header, Static
+
+
+class Dashboard(App):
+    def compose(self):
+        yield Header()
+        with Grid():
+            for name in ("cpu", "memory", "disk", "net"):
+                yield Static(f"{name}: {psutil.cpu_percent()}", id=name)
+        yield Footer()
+
+    def on_ready(self):
+        self.exit()
+
+
+if __name__ == "__main__":
+    Dashboard().run()
+'''
+
+
+def timed(launch) -> float:
+    start = time.perf_counter()
+    result = launch()
+    assert result.returncode == 0, result.stderr
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--out", type=Path, help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    os.environ["TEXTUAL_DRIVER"] = "textual.drivers.headless_driver:HeadlessDriver"
+    python = str(envpool.acquire(["textual", "psutil"]))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        script = str(Path(tmp) / "dashboard.py")
+        Path(script).write_text(DASHBOARD)
+        cmd = [python, script]
+
+        process = [timed(lambda: subprocess.run(cmd, capture_output=True, text=True)) for _ in range(args.runs)]
+
+        with supervisor.SupervisedLauncher() as launcher:
+            first = timed(lambda: launcher(cmd))  # Starts the supervisor too
+            supervised = [timed(lambda: launcher(cmd)) for _ in range(args.runs)]
+
+    results = {
+        "config": {"runs": args.runs},
+        "new_process": {"median": round(statistics.median(process), 4), "max": round(max(process), 4)},
+        "supervisor": {
+            "first_run_including_start": round(first, 4),
+            "median": round(statistics.median(supervised), 4),
+            "max": round(max(supervised), 4),
+        },
+    }
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.out:
+        args.out.write_text(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""CLI startup and prompt-to-launch latency, with and without a resident `hacker-dash serve`.
+
+Each measurement is a fresh `hacker-dash` process, as a user would run it. Generation goes to
+benchmarks/mock_server.py (fixed model latency), and the generated dashboard quits as soon as
+it is ready, so prompt-to-launch is the full `generate` command wall time.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--no-daemon] [--out results.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import mock_server  # noqa: E402
+
+
+def wall(cmd: list[str], env: dict) -> float:
+    start = time.perf_counter()
+    subprocess.run(cmd, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def median_of(runs: int, cmd: list[str], env: dict) -> float:
+    return round(statistics.median(wall(cmd, env) for _ in range(runs)), 4)
+
+
+def wait_for_daemon(env: dict, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        ping = subprocess.run([sys.executable, "-c", "from hacker_dash import daemon; assert daemon.connect()"],
+                              env=env, capture_output=True)
+        if ping.returncode == 0:
+            return
+        time.sleep(0.1)
+    raise TimeoutError("hacker-dash serve did not start")
+
+
+def run(args) -> dict:
+    config = mock_server.MockConfig(ttft=args.ttft, generate_code=mock_server.FIXED_CODE)
+    server, url = mock_server.start(config)
+
+    # Separate HOME so the user's stats, cache and daemon socket are untouched
+    home = Path(tempfile.mkdtemp(prefix="hacker-dash-bench-"))
+    env = {**os.environ, "HOME": str(home), "ANTHROPIC_BASE_URL": url, "ANTHROPIC_API_KEY": "mock"}
+    cli = [shutil.which("hacker-dash") or "hacker-dash"]
+    generate = cli + ["generate", "monitor system resources", "--no-cache"]
+
+    # Build the dashboard's environment once so every run measures a warm pool
+    subprocess.run(generate, env=env, stdin=subprocess.DEVNULL, capture_output=True)
+
+    results = {
+        "config": {"runs": args.runs, "ttft": args.ttft},
+        "import_main": median_of(args.runs, [sys.executable, "-c", "import hacker_dash.main"], env),
+        "python_baseline": median_of(args.runs, [sys.executable, "-c", "pass"], env),
+        "cli_help": median_of(args.runs, cli + ["--help"], env),
+        "config_help": median_of(args.runs, cli + ["config", "--help"], env),
+        "prompt_to_launch": median_of(args.runs, generate, env),
+    }
+
+    if not args.no_daemon:
+        daemon = subprocess.Popen(cli + ["serve"], env=env, stdin=subprocess.DEVNULL,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_daemon(env)
+            results["prompt_to_launch_daemon"] = median_of(args.runs, generate, env)
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+    server.shutdown()
+    shutil.rmtree(home, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Runs per measurement (median is reported)")
+    parser.add_argument("--ttft", type=float, default=0.2, help="Simulated time to first token (s)")
+    parser.add_argument("--no-daemon", action="store_true", help="Skip the `hacker-dash serve` measurements")
+    parser.add_argument("--out", type=Path, help="Also write the JSON results to this file")
+    args = parser.parse_args()
+
+    results = json.dumps(run(args), indent=2)
+    print(results)
+    if args.out:
+        args.out.write_text(results + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Local stand-in for the Anthropic Messages API with scripted latency and canned responses.
+
+Generation requests get `generate_code` (broken by default, to exercise healing).
+Heal requests get search/replace blocks when a patch is asked for, else `fixed_code`.
+Point the SDK at it with ANTHROPIC_BASE_URL=http://127.0.0.1:<port>.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HEADER = '# /// script\n# dependencies = ["textual", "psutil"]\n# ///\n'
+
+FIXED_CODE = HEADER + '''from textual.app import App, ComposeResult
+from textual.widgets import Header, Static
+
+
+class Dashboard(App):
+    def compose(self) -> ComposeResult:
+        yield Header()
+        yield Static("ok")
+
+    def on_ready(self) -> None:
+        self.exit()
+
+
+if __name__ == "__main__":
+    Dashboard().run()
+'''
+
+# Crashes on mount with an error no local heal rule matches
+BROKEN_LINE = '        raise RuntimeError("sensor offline")\n'
+BROKEN_CODE = FIXED_CODE.replace("    def on_ready(self) -> None:\n", "    def on_mount(self) -> None:\n" + BROKEN_LINE + "\n    def on_ready(self) -> None:\n")
+
+PATCH_RESPONSE = f"""<<<<<<< SEARCH
+    def on_mount(self) -> None:
+{BROKEN_LINE.rstrip()}
+=======
+    def on_mount(self) -> None:
+        pass
+>>>>>>> REPLACE"""
+
+
+class MockConfig:
+    def __init__(self, ttft: float = 0.2, tokens_per_second: float = 200.0, generate_code: str = BROKEN_CODE,
+                 fixed_code: str = FIXED_CODE, patch_response: str = PATCH_RESPONSE, chunk_chars: int = 16):
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.generate_code = generate_code
+        self.fixed_code = fixed_code
+        self.patch_response = patch_response
+        self.chunk_chars = chunk_chars
+        self.requests = []
+
+
+def _text_of(content) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    config: MockConfig
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["content-length"])))
+        self.config.requests.append(body)
+
+        prompt = _text_of(body.get("system", "")) + "".join(_text_of(m["content"]) for m in body["messages"])
+        if "SEARCH" in prompt and "ORIGINAL CODE" in prompt:
+            text = self.config.patch_response
+        elif "ORIGINAL CODE" in prompt:
+            text = self.config.fixed_code
+        else:
+            text = self.config.generate_code
+
+        usage = {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4,
+                 "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+        time.sleep(self.config.ttft)
+        if body.get("stream"):
+            self._stream(body, text, usage)
+        else:
+            time.sleep(usage["output_tokens"] / self.config.tokens_per_second)
+            self._json(200, {
+                "id": "msg_mock", "type": "message", "role": "assistant", "model": body["model"],
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn", "stop_sequence": None, "usage": usage,
+            })
+
+    def _json(self, status: int, payload: dict):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _event(self, name: str, payload: dict):
+        self.wfile.write(f"event: {name}\ndata: {json.dumps(payload)}\n\n".encode())
+        self.wfile.flush()
+
+    def _stream(self, body: dict, text: str, usage: dict):
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.end_headers()
+
+        self._event("message_start", {"type": "message_start", "message": {
+            "id": "msg_mock", "type": "message", "role": "assistant", "model": body["model"], "content": [],
+            "stop_reason": None, "stop_sequence": None, "usage": {**usage, "output_tokens": 1},
+        }})
+        self._event("content_block_start", {"type": "content_block_start", "index": 0,
+                                            "content_block": {"type": "text", "text": ""}})
+        size = self.config.chunk_chars
+        for i in range(0, len(text), size):
+            time.sleep(size / 4 / self.config.tokens_per_second)
+            self._event("content_block_delta", {"type": "content_block_delta", "index": 0,
+                                                "delta": {"type": "text_delta", "text": text[i:i + size]}})
+        self._event("content_block_stop", {"type": "content_block_stop", "index": 0})
+        self._event("message_delta", {"type": "message_delta",
+                                      "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                      "usage": {"output_tokens": usage["output_tokens"]}})
+        self._event("message_stop", {"type": "message_stop"})
+
+
+def start(config: MockConfig = None, port: int = 0) -> tuple[ThreadingHTTPServer, str]:
+    """Serve in a daemon thread; returns the server and its base URL."""
+    handler = type("Handler", (MockHandler,), {"config": config or MockConfig()})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    server, url = start(port=8765)
+    print(f"Mock Anthropic API on {url}")
+    threading.Event().wait()
@@ -0,0 +1,127 @@
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from . import injector, validator
+
+RETRYABLE_STATUS = {429, 529}  # Rate limited, overloaded
+MAX_BACKOFF = 60.0
+MANIFEST_NAME = "manifest.jsonl"
+
+
+class TokenBucket:
+    """Allow `rate` requests per second on average with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def load_prompts(prompts_file: Path) -> list[dict]:
+    """Read `{"prompt": ..., "id": ...}` lines; ids default to the line number."""
+    prompts = []
+    for number, line in enumerate(prompts_file.read_text().splitlines(), 1):
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        if isinstance(item, str):
+            item = {"prompt": item}
+        item.setdefault("id", f"{number:04d}")
+        prompts.append(item)
+    return prompts
+
+
+def load_manifest(out_dir: Path) -> dict:
+    manifest = out_dir / MANIFEST_NAME
+    if not manifest.exists():
+        return {}
+    entries = [json.loads(line) for line in manifest.read_text().splitlines() if line.strip()]
+    return {entry["id"]: entry for entry in entries}
+
+
+def _retry_after(exc: Exception, attempt: int) -> float:
+    response = getattr(exc, "response", None)
+    header = response.headers.get("retry-after") if response is not None else None
+    if header:
+        try:
+            return min(float(header), MAX_BACKOFF)
+        except ValueError:
+            pass
+    # Exponential backoff with full jitter
+    return random.uniform(0, min(MAX_BACKOFF, 2 ** attempt))
+
+
+def generate_with_retries(generate, prompt: str, bucket: TokenBucket, max_retries: int) -> tuple[str, int]:
+    """Call generate(prompt), backing off on rate-limit and overload errors. Returns (code, retries)."""
+    for attempt in range(max_retries + 1):
+        bucket.acquire()
+        try:
+            return generate(prompt), attempt
+        except Exception as e:
+            if getattr(e, "status_code", None) not in RETRYABLE_STATUS or attempt == max_retries:
+                raise
+            time.sleep(_retry_after(e, attempt))
+
+
+def run_batch(prompts_file: Path, out_dir: Path, generate, concurrency: int = 4,
+              rate: float = 1.0, max_retries: int = 5, on_result=None) -> list[dict]:
+    """Generate and validate every prompt, saving valid scripts and appending to the manifest.
+
+    Prompts already recorded in the manifest are skipped, so an interrupted
+    batch resumes where it left off. `generate` maps a prompt to code.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # Failed requests are retried on resume; ok and invalid results are final
+    done = {id_ for id_, entry in load_manifest(out_dir).items() if entry["status"] != "error"}
+    pending = [item for item in load_prompts(prompts_file) if item["id"] not in done]
+
+    bucket = TokenBucket(rate)
+    results = []
+
+    def work(item: dict) -> dict:
+        start = time.time()
+        entry = {"id": item["id"], "prompt": item["prompt"]}
+        try:
+            code, retries = generate_with_retries(generate, item["prompt"], bucket, max_retries)
+        except Exception as e:
+            return {**entry, "status": "error", "error": repr(e), "latency": time.time() - start}
+
+        error = validator.validate(code)
+        entry.update(retries=retries, latency=time.time() - start)
+        if error:
+            return {**entry, "status": "invalid", "error": error}
+
+        # Saved scripts must run standalone, so they carry the metrics runtime they use
+        script = out_dir / f"{item['id']}.py"
+        script.write_text(injector.inject_metrics_runtime(code))
+        return {**entry, "status": "ok", "script": script.name}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(work, item) for item in pending]
+        for future in as_completed(futures):
+            entry = future.result()
+            with open(out_dir / MANIFEST_NAME, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            results.append(entry)
+            if on_result:
+                on_result(entry)
+
+    return results
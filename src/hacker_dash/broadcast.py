@@ -0,0 +1,279 @@
+import os
+import select
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from platformdirs import user_cache_dir
+
+# Viewers only need watch(), which sticks to the standard library; the dashboard side imports
+# executor when it runs, so each `hacker-dash watch` costs a bare interpreter's memory
+
+SOCKET_PATH = Path(user_cache_dir("hacker-dash")) / "broadcast.sock"
+
+FRAME_RATE = 30  # Most screen updates per second sent to viewers; output in between is coalesced
+MAX_BACKLOG = 1024 * 1024  # Bytes queued for a slow viewer before it's resynced with a full repaint
+DEFAULT_SIZE = (120, 40)  # Columns, rows when the host isn't a terminal
+REPAINT_DELAY = 0.05  # Seconds a repaint resize is held so Textual sees two distinct sizes
+
+CLEAR_SCREEN = b"\x1b[2J\x1b[H"
+VIEWER_SETUP = b"\x1b[?1049h\x1b[?25l" + CLEAR_SCREEN  # Alternate screen, hidden cursor
+# Undo whatever the dashboard switched on (mouse reporting, styles) along with the setup
+VIEWER_RESET = b"\x1b[?1000l\x1b[?1003l\x1b[?1006l\x1b[?1015l\x1b[0m\x1b[?25h\x1b[?1049l"
+DETACH_KEYS = (b"q", b"\x03")
+
+
+class BroadcastError(RuntimeError):
+    """A broadcast could not be started or watched."""
+
+
+class _Viewer:
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.backlog = bytearray()
+
+    def flush(self) -> bool:
+        """Send what the socket takes without blocking; False once the viewer has gone."""
+        try:
+            sent = self.sock.send(self.backlog)
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+        del self.backlog[:sent]
+        return True
+
+
+def _set_winsize(fd: int, columns: int, rows: int):
+    import fcntl
+    import struct
+    import termios
+
+    fcntl.ioctl(fd, termios.TIOCSWINSZ, struct.pack("HHHH", rows, columns, 0, 0))
+
+
+def _host_size() -> tuple[int, int]:
+    if sys.stdout.isatty():
+        size = os.get_terminal_size(sys.stdout.fileno())
+        return size.columns, size.lines
+    return DEFAULT_SIZE
+
+
+class Broadcaster:
+    """Runs dashboards headlessly and streams their screen to `hacker-dash watch` clients.
+
+    Use as a context manager; run() has launch()'s signature, so it can be handed to
+    executor.run_dashboard. The socket outlives each run, so viewers stay attached while a
+    crashed dashboard is healed and relaunched.
+    """
+
+    def __init__(self, path: Path = SOCKET_PATH, frame_rate: int = FRAME_RATE, on_viewers=None):
+        self.path = path
+        self.frame_rate = frame_rate
+        self.on_viewers = on_viewers  # Called with the viewer count when it changes
+        self.size = DEFAULT_SIZE
+        self.server = None
+        self.viewers = []
+
+    def __enter__(self):
+        if os.name != "posix" or not hasattr(socket, "AF_UNIX"):
+            raise BroadcastError("Broadcast mode needs a pseudo-terminal and Unix domain sockets")
+        if _listening(self.path):
+            raise BroadcastError(f"A dashboard is already broadcasting on {self.path}")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.unlink(missing_ok=True)  # Stale socket from a broadcast that didn't exit cleanly
+
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(str(self.path))
+        # Viewers can only watch (their input never reaches the dashboard), so other local users may connect
+        os.chmod(self.path, 0o666)
+        self.server.listen()
+        self.server.setblocking(False)
+        self.size = _host_size()
+        return self
+
+    def __exit__(self, *exc):
+        for viewer in self.viewers:
+            viewer.sock.close()
+        self.viewers = []
+        self.server.close()
+        self.path.unlink(missing_ok=True)
+
+    def _drop(self, viewer: _Viewer):
+        viewer.sock.close()
+        self.viewers.remove(viewer)
+        if self.on_viewers:
+            self.on_viewers(len(self.viewers))
+
+    def run(self, cmd: list[str]) -> subprocess.CompletedProcess:
+        """Run cmd on a pseudo-terminal nobody types into, sending its output to every viewer."""
+        from .executor import OUTPUT_TAIL_BYTES, spawn_in_pty, wait_result
+
+        pid, master = spawn_in_pty(cmd)
+        columns, rows = self.size
+        _set_winsize(master, columns, rows)
+        for viewer in self.viewers:
+            viewer.backlog += CLEAR_SCREEN  # A relaunch after a heal starts from a blank screen
+
+        tail = bytearray()
+        pending = bytearray()  # Output since the last frame went out
+        frame_interval = 1 / self.frame_rate
+        next_frame = 0.0
+        repaint_at = None
+        stopped = False
+
+        def request_repaint():
+            # Textual only redraws everything on a size change, so shrink by a row and restore shortly after
+            nonlocal repaint_at
+            if repaint_at is None:
+                _set_winsize(master, columns, rows - 1)
+                repaint_at = time.monotonic() + REPAINT_DELAY
+
+        try:
+            while True:
+                deadlines = [next_frame] if pending else []
+                if repaint_at is not None:
+                    deadlines.append(repaint_at)
+                timeout = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+                readable, writable, _ = select.select(
+                    [master, self.server] + [viewer.sock for viewer in self.viewers],
+                    [viewer.sock for viewer in self.viewers if viewer.backlog], [], timeout
+                )
+
+                if master in readable:
+                    try:
+                        data = os.read(master, 65536)
+                    except OSError:  # EIO once the child side closes
+                        data = b""
+                    if not data:
+                        break
+                    pending += data
+                    tail += data
+                    del tail[:-OUTPUT_TAIL_BYTES]
+
+                if self.server in readable:
+                    try:
+                        sock, _ = self.server.accept()
+                    except BlockingIOError:
+                        sock = None
+                    if sock is not None:
+                        sock.setblocking(False)
+                        self.viewers.append(_Viewer(sock))
+                        if self.on_viewers:
+                            self.on_viewers(len(self.viewers))
+                        request_repaint()
+
+                for viewer in list(self.viewers):
+                    if viewer.sock in readable:
+                        try:
+                            closed = not viewer.sock.recv(4096)  # Viewers only ever send to detach
+                        except OSError:
+                            closed = True
+                        if closed:
+                            self._drop(viewer)
+
+                now = time.monotonic()
+                if repaint_at is not None and now >= repaint_at:
+                    _set_winsize(master, columns, rows)
+                    repaint_at = None
+
+                if pending and now >= next_frame:
+                    # Textual's output is already a diff of changed regions; batching it per frame
+                    # means one write per viewer per frame however often the dashboard refreshes
+                    for viewer in self.viewers:
+                        viewer.backlog += pending
+                        if len(viewer.backlog) > MAX_BACKLOG:
+                            # Too far behind to catch up on diffs; start it over from a full frame
+                            viewer.backlog = bytearray(CLEAR_SCREEN)
+                            request_repaint()
+                    pending.clear()
+                    next_frame = now + frame_interval
+
+                for viewer in list(self.viewers):
+                    if viewer.sock in writable and viewer in self.viewers and not viewer.flush():
+                        self._drop(viewer)
+        except KeyboardInterrupt:
+            stopped = True
+            os.kill(pid, signal.SIGTERM)
+        finally:
+            os.close(master)
+
+        # Let viewers see the dashboard's last output (e.g. its traceback) before a heal relaunches it
+        for viewer in list(self.viewers):
+            viewer.backlog += pending
+            viewer.sock.setblocking(True)
+            try:
+                viewer.sock.sendall(viewer.backlog)
+            except OSError:
+                self._drop(viewer)
+                continue
+            viewer.sock.setblocking(False)
+            viewer.backlog.clear()
+
+        result = wait_result(cmd, pid, tail)
+        if stopped:
+            # Stopping the broadcast is a clean exit, not a crash to heal
+            return subprocess.CompletedProcess(cmd, 0, stderr="")
+        return result
+
+
+def _listening(path: Path) -> bool:
+    if not path.exists():
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return False
+    return True
+
+
+def watch(path: Path = SOCKET_PATH):
+    """Show a broadcast dashboard in this terminal until it ends or q / Ctrl+C is pressed."""
+    import termios
+    import tty
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        raise BroadcastError(f"Nothing is broadcasting on {path}; start one with `hacker-dash generate --serve`")
+
+    stdin_fd = sys.stdin.fileno()
+    stdout_fd = sys.stdout.fileno()
+    old_mode = None
+    if os.isatty(stdin_fd):
+        old_mode = termios.tcgetattr(stdin_fd)
+        tty.setraw(stdin_fd)  # Single keys detach without echoing into the picture
+
+    os.write(stdout_fd, VIEWER_SETUP)
+    fds = [sock, stdin_fd]
+    try:
+        while True:
+            readable, _, _ = select.select(fds, [], [])
+            if sock in readable:
+                data = sock.recv(65536)
+                if not data:
+                    break
+                os.write(stdout_fd, data)
+            if stdin_fd in readable:
+                data = os.read(stdin_fd, 1024)
+                if not data:
+                    fds.remove(stdin_fd)
+                elif any(key in data for key in DETACH_KEYS):
+                    break
+    finally:
+        sock.close()
+        os.write(stdout_fd, VIEWER_RESET)
+        if old_mode is not None:
+            termios.tcsetattr(stdin_fd, termios.TCSAFLUSH, old_mode)
+
+
+if __name__ == "__main__":
+    try:
+        watch()
+    except BroadcastError as e:
+        sys.exit(f"Error: {e}")
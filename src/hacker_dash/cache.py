@@ -0,0 +1,62 @@
+import hashlib
+import json
+import time
+from pathlib import Path
+from platformdirs import user_cache_dir
+
+CACHE_DIR = Path(user_cache_dir("hacker-dash")) / "generations"
+MAX_CACHE_BYTES = 50 * 1024 * 1024
+MAX_CACHE_AGE = 7 * 24 * 60 * 60  # One week
+
+
+def cache_key(model: str, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+    """Hash everything that determines the model's output."""
+    payload = json.dumps([model, system_prompt, user_prompt, max_tokens])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get(key: str) -> str | None:
+    path = CACHE_DIR / f"{key}.py"
+    if not path.exists():
+        return None
+
+    if time.time() - path.stat().st_mtime > MAX_CACHE_AGE:
+        path.unlink(missing_ok=True)
+        return None
+
+    # Touch so eviction drops the least recently used entries first
+    path.touch()
+    return path.read_text()
+
+
+def put(key: str, code: str):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Write then rename so concurrent readers never see a partial entry
+    tmp_path = CACHE_DIR / f"{key}.tmp"
+    tmp_path.write_text(code)
+    tmp_path.replace(CACHE_DIR / f"{key}.py")
+
+    evict()
+
+
+def evict():
+    """Drop expired entries, then the oldest ones until under the size cap."""
+    now = time.time()
+    entries = []
+    for path in CACHE_DIR.glob("*.py"):
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        if now - st.st_mtime > MAX_CACHE_AGE:
+            path.unlink(missing_ok=True)
+        else:
+            entries.append((st.st_mtime, st.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= MAX_CACHE_BYTES:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
@@ -0,0 +1,177 @@
+import re
+
+ERROR_TOKEN_BUDGET = 800  # Default budget for the error text in a heal prompt
+
+CHAIN_MESSAGES = (
+    "During handling of the above exception, another exception occurred:",
+    "The above exception was the direct cause of the following exception:",
+)
+
+# Frames from these locations are library code, not the dashboard
+LIBRARY_PATH = re.compile(r'site-packages|dist-packages|[\\/]lib[\\/]python\d|<frozen |[\\/]runpy\.py$')
+
+PLAIN_FRAME = re.compile(r'^\s*File "(?P<file>[^"]+)", line (?P<line>\d+), in (?P<func>.+)$')
+# Rich (Textual) tracebacks draw frames inside a box: "│ /path/file.py:17 in on_mount   │"
+RICH_FRAME = re.compile(r'^│ (?P<file>\S.*?):(?P<line>\d+) in (?P<func>\S+)\s*│$')
+RICH_SOURCE = re.compile(r'^│ ❱\s*\d+ (?P<source>.*?)\s*│$')
+RICH_HEADER = re.compile(r'^╭─+ Traceback')
+RICH_BOX_END = re.compile(r'^╰─+╯$')
+RICH_GUTTER = re.compile(r'│ ')
+REPEATED = re.compile(r'\[Previous line repeated (\d+) more times?\]')
+# Stray control characters (e.g. a BEL) the terminal output cleanup leaves behind
+CONTROL_CHARS = re.compile(r'[\x00-\x08\x0b-\x1f\x7f]')
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4  # Same rough estimate as the streaming progress
+
+
+class Frame:
+    def __init__(self, file: str, line: int, func: str, source: str = ""):
+        self.file = file
+        self.line = line
+        self.func = func
+        self.source = source
+        self.repeats = 0  # From Python's own "[Previous line repeated N more times]"
+
+    @property
+    def is_library(self) -> bool:
+        return bool(LIBRARY_PATH.search(self.file))
+
+    def key(self) -> tuple:
+        return (self.file, self.line, self.func)
+
+    def render(self) -> str:
+        text = f'  File "{self.file}", line {self.line}, in {self.func}'
+        return f"{text}\n    {self.source}" if self.source else text
+
+
+def _rich_source(line: str) -> str:
+    match = RICH_SOURCE.match(line.rstrip())
+    if not match:
+        return ""
+    # Rich draws indentation guides as "│   "; put plain indentation back
+    return RICH_GUTTER.sub("", match["source"]).strip()
+
+
+def _parse(lines: list[str]) -> list[tuple[list[Frame], list[str], str]]:
+    """Split output into (frames, exception lines, chain message) per traceback, oldest first."""
+    tracebacks = []
+    frames, exception, chain = None, [], ""
+    in_rich_box = False
+
+    for raw in lines:
+        line = CONTROL_CHARS.sub("", raw).rstrip()
+        stripped = line.strip()
+
+        if stripped in CHAIN_MESSAGES:
+            if frames is not None:
+                tracebacks.append((frames, exception, chain))
+            frames, exception, chain = None, [], stripped
+            continue
+        if stripped.startswith("Traceback (most recent call last)") or RICH_HEADER.match(stripped):
+            if frames is not None and (frames or exception):
+                tracebacks.append((frames, exception, chain))
+                chain = ""
+            frames, exception = [], []
+            in_rich_box = stripped.startswith("╭")
+            continue
+        if frames is None:
+            continue  # Screen output before the first traceback
+
+        if in_rich_box:
+            if RICH_BOX_END.match(stripped):
+                in_rich_box = False
+            elif match := RICH_FRAME.match(stripped):
+                frames.append(Frame(match["file"], int(match["line"]), match["func"]))
+            elif frames and not frames[-1].source and (source := _rich_source(stripped)):
+                frames[-1].source = source
+            continue
+
+        if match := PLAIN_FRAME.match(line):
+            frames.append(Frame(match["file"], int(match["line"]), match["func"]))
+        elif line.startswith("    ") and frames and not frames[-1].source and not exception:
+            frames[-1].source = stripped
+        elif (match := REPEATED.match(stripped)) and frames:
+            frames[-1].repeats += int(match[1])
+        elif stripped and not line.startswith("    "):
+            exception.append(stripped)
+
+    if frames is not None:
+        tracebacks.append((frames, exception, chain))
+    return tracebacks
+
+
+def _render_frames(frames: list[Frame], keep_library: int) -> list[str]:
+    """User frames only, with runs of library frames and repeated frames collapsed to one note."""
+    user = [frame for frame in frames if not frame.is_library]
+    if not user:
+        # Nothing of the dashboard's on the stack; the innermost library frames are the best clue
+        user = frames[-keep_library:]
+
+    rendered = []
+    omitted = 0
+    previous, repeats = None, 0
+    kept = set(map(id, user))
+    for frame in frames:
+        if id(frame) not in kept:
+            omitted += 1
+            continue
+        if omitted:
+            rendered.append(f"  [{omitted} library frame{'s' if omitted > 1 else ''} omitted]")
+            omitted = 0
+        if previous is not None and frame.key() == previous.key():
+            repeats += 1 + frame.repeats
+            continue
+        if repeats:
+            rendered.append(f"  [Previous frame repeated {repeats} more time{'s' if repeats > 1 else ''}]")
+            repeats = 0
+        rendered.append(frame.render())
+        repeats = frame.repeats
+        previous = frame
+    if repeats:
+        rendered.append(f"  [Previous frame repeated {repeats} more time{'s' if repeats > 1 else ''}]")
+    if omitted:
+        rendered.append(f"  [{omitted} library frame{'s' if omitted > 1 else ''} omitted]")
+    return rendered
+
+
+def _fit(text: str, budget: int) -> str:
+    """Cut from the middle, keeping the head and the tail (where the exception is)."""
+    limit = budget * 4
+    if len(text) <= limit:
+        return text
+    marker = "\n[... truncated ...]\n"
+    if limit <= len(marker):
+        return text[len(text) - limit:]  # No room for both ends; the tail is what matters
+    head = limit // 3
+    tail = max(limit - head - len(marker), 0)
+    # Not text[-tail:], which is the whole text when tail is 0
+    return (text[:head] + marker + text[len(text) - tail:])[:limit]
+
+
+def condense(error: str, budget: int = ERROR_TOKEN_BUDGET) -> str:
+    """Reduce crash output to the dashboard's own frames and the exception chain, within budget tokens."""
+    tracebacks = _parse(error.splitlines())
+    if not tracebacks:
+        # Not a traceback (e.g. a stylesheet error); drop repeated lines and trim
+        lines, seen = [], set()
+        for line in error.strip().splitlines():
+            if line.strip() and line not in seen:
+                seen.add(line)
+                lines.append(line.rstrip())
+        return _fit("\n".join(lines), budget)
+
+    # Shed detail until it fits: first all but the last frames of each traceback, then the earlier chain links
+    for max_frames, max_chain in ((None, None), (6, None), (3, 2), (2, 1)):
+        sections = []
+        for frames, exception, chain in tracebacks[-max_chain if max_chain else 0:]:
+            rendered = _render_frames(frames, keep_library=2)
+            if max_frames and len(rendered) > max_frames:
+                rendered = ["  [earlier frames omitted]"] + rendered[-max_frames:]
+            section = ([chain, ""] if chain else []) + ["Traceback (most recent call last):"] + rendered + exception
+            sections.append("\n".join(section))
+        text = "\n\n".join(sections)
+        if estimate_tokens(text) <= budget:
+            return text
+    return _fit(text, budget)
@@ -8,21 +8,39 @@ load_dotenv()
 CONFIG_DIR = Path(user_config_dir("hacker-dash"))
 CONFIG_FILE = CONFIG_DIR / "config.env"
 
-def get_api_key() -> str:
+def _config_value(name: str) -> str | None:
     # Check environment variable first
-    key = os.getenv("ANTHROPIC_API_KEY")
-    if key:
-        return key
+    value = os.getenv(name)
+    if value:
+        return value
     
     # Check config file
     if CONFIG_FILE.exists():
         with open(CONFIG_FILE) as f:
             for line in f:
-                if line.startswith("ANTHROPIC_API_KEY="):
+                if line.startswith(f"{name}="):
                     return line.split("=", 1)[1].strip()
-    
+    return None
+
+def get_api_key() -> str:
+    key = _config_value("ANTHROPIC_API_KEY")
+    if key:
+        return key
     raise ValueError("No API key found. Run 'hacker-dash config' to set it up.")
 
+def get_gemini_api_key() -> str | None:
+    """Optional; enables Gemini as a hedge provider."""
+    return _config_value("GEMINI_API_KEY") or _config_value("GOOGLE_API_KEY")
+
+def get_hedge_providers() -> str | None:
+    """Comma-separated name:model specs to hedge with, or "none"; unset means the default."""
+    return _config_value("HACKER_DASH_HEDGE")
+
+def get_error_token_budget() -> int | None:
+    """Token budget for crash output in heal prompts (HACKER_DASH_ERROR_TOKENS); unset means the default."""
+    value = _config_value("HACKER_DASH_ERROR_TOKENS")
+    return int(value) if value and value.isdigit() else None
+
 def save_api_key(key: str):
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
     with open(CONFIG_FILE, "w") as f:
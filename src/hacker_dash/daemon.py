@@ -0,0 +1,167 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+from pathlib import Path
+from platformdirs import user_cache_dir
+
+SOCKET_PATH = Path(user_cache_dir("hacker-dash")) / "daemon.sock"
+
+# Most generated dashboards need exactly these; building their env up front makes the first launch warm
+DEFAULT_DEPENDENCIES = ["textual", "psutil"]
+
+
+class DaemonError(RuntimeError):
+    """The daemon could not be reached or reported a failure."""
+
+
+class Client:
+    """Thin client for `hacker-dash serve`, with the same call signatures as brain."""
+
+    def __init__(self, path: Path = SOCKET_PATH):
+        self.path = path
+
+    def _call(self, request: dict, status_callback=None):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(self.path))
+            sock.sendall((json.dumps(request) + "\n").encode())
+            with sock.makefile("r", encoding="utf-8") as lines:
+                for line in lines:
+                    message = json.loads(line)
+                    if "status" in message:
+                        if status_callback:
+                            status_callback(message["status"])
+                    elif "error" in message:
+                        raise DaemonError(message["error"])
+                    else:
+                        return message["result"]
+        raise DaemonError("Daemon closed the connection without a result")
+
+    def ping(self) -> dict:
+        return self._call({"op": "ping"})
+
+    def shutdown(self):
+        self._call({"op": "shutdown"})
+
+    def generate_dashboard(self, api_key: str, user_prompt: str, status_callback=None,
+                           use_cache: bool = True, refresh: bool = False, candidates: int = 1,
+                           seed: str = None) -> str:
+        return self._call({
+            "op": "generate", "api_key": api_key, "prompt": user_prompt,
+            "use_cache": use_cache, "refresh": refresh, "candidates": candidates, "seed": seed,
+        }, status_callback)
+
+    def fix_dashboard(self, api_key: str, broken_code: str, error_message: str, problem: str = "crash") -> str:
+        return self._call({
+            "op": "fix", "api_key": api_key, "code": broken_code, "error": error_message, "problem": problem,
+        })
+
+
+    def refine_dashboard(self, api_key: str, code: str, request: str) -> str:
+        return self._call({"op": "refine", "api_key": api_key, "code": code, "request": request})
+
+
+def connect(path: Path = SOCKET_PATH) -> Client | None:
+    """Return a client for a running daemon, or None so callers fall back to working in-process."""
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        return None
+    client = Client(path)
+    try:
+        client.ping()
+    except (OSError, ValueError, DaemonError):
+        return None
+    return client
+
+
+def _warm(dependencies: list[str]):
+    from . import envpool
+
+    try:
+        envpool.acquire(dependencies)
+    except Exception:
+        pass  # Best effort; the launch builds (and reports) it if this failed
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def _send(self, message: dict):
+        # Hedged requests report progress from several threads at once
+        with self._send_lock:
+            self.wfile.write((json.dumps(message) + "\n").encode())
+            self.wfile.flush()
+
+    def handle(self):
+        self._send_lock = threading.Lock()
+        try:
+            request = json.loads(self.rfile.readline())
+            self._send({"result": self._dispatch(request)})
+        except Exception as e:
+            self._send({"error": f"{type(e).__name__}: {e}"})
+
+    def _dispatch(self, request: dict):
+        from . import brain, validator
+
+        op = request.get("op")
+        if op == "ping":
+            return {"pid": os.getpid()}
+        if op == "shutdown":
+            # shutdown() waits for serve_forever to return, so it can't run on this thread
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return None
+        if op == "generate":
+            code = brain.generate_dashboard(
+                request["api_key"], request["prompt"],
+                status_callback=lambda message: self._send({"status": message}),
+                use_cache=request.get("use_cache", True), refresh=request.get("refresh", False),
+                candidates=request.get("candidates", 1), seed=request.get("seed")
+            )
+            # The client validates and launches next; get its environment ready meanwhile
+            try:
+                dependencies = validator.script_dependencies(code)
+            except (ValueError, SyntaxError):
+                dependencies = None
+            if dependencies is not None:
+                threading.Thread(target=_warm, args=(dependencies,), daemon=True).start()
+            return code
+        if op == "fix":
+            return brain.fix_dashboard(request["api_key"], request["code"], request["error"],
+                                       problem=request.get("problem", "crash"))
+        if op == "refine":
+            return brain.refine_dashboard(request["api_key"], request["code"], request["request"])
+        raise ValueError(f"Unknown op: {op!r}")
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(path: Path = SOCKET_PATH, on_ready=None):
+    """Serve generation, heal and refine requests on a Unix socket until shut down."""
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonError("hacker-dash serve needs Unix domain sockets")
+    if connect(path):
+        raise DaemonError(f"A daemon is already listening on {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)  # Stale socket from a daemon that didn't exit cleanly
+
+    # Pay for the SDK import and client construction once, not per command
+    from . import brain, config
+    try:
+        brain.get_client(config.get_api_key())
+    except ValueError:
+        pass  # No key configured yet; clients send theirs with each request
+    threading.Thread(target=_warm, args=(DEFAULT_DEPENDENCIES,), daemon=True).start()
+
+    old_umask = os.umask(0o177)  # The socket carries API keys: owner-only
+    try:
+        server = _Server(str(path), _Handler)
+    finally:
+        os.umask(old_umask)
+
+    try:
+        if on_ready:
+            on_ready(path)
+        server.serve_forever()
+    finally:
+        server.server_close()
+        path.unlink(missing_ok=True)
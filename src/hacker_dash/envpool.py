@@ -0,0 +1,109 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from platformdirs import user_cache_dir
+
+from .validator import script_dependencies, script_header
+
+POOL_DIR = Path(user_cache_dir("hacker-dash")) / "envs"
+MAX_ENVS = 8
+USED_MARKER = ".last-used"
+
+
+def normalize(dependencies: list[str]) -> list[str]:
+    return sorted({dep.strip().lower().replace("_", "-") for dep in dependencies})
+
+
+def env_key(dependencies: list[str]) -> str:
+    # The interpreter version is part of the key so upgrades never reuse stale envs
+    payload = "\n".join([sys.version.split()[0], *normalize(dependencies)])
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def env_python(env_dir: Path) -> Path:
+    if os.name == "nt":
+        return env_dir / "Scripts" / "python.exe"
+    return env_dir / "bin" / "python"
+
+
+def build(dependencies: list[str], env_dir: Path):
+    """Create a virtualenv with the dependencies, atomically moving it into place."""
+    POOL_DIR.mkdir(parents=True, exist_ok=True)
+    staging = POOL_DIR / f"{env_dir.name}.{os.getpid()}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+
+    try:
+        subprocess.run(
+            ["uv", "venv", "--quiet", "--python", sys.executable, str(staging)],
+            check=True, capture_output=True
+        )
+        if dependencies:
+            subprocess.run(
+                ["uv", "pip", "install", "--quiet", "--python", str(env_python(staging)), *dependencies],
+                check=True, capture_output=True
+            )
+        staging.rename(env_dir)
+    except OSError:
+        # Another process finished building the same env first
+        shutil.rmtree(staging, ignore_errors=True)
+        if not env_dir.exists():
+            raise
+    except subprocess.CalledProcessError:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def acquire(dependencies: list[str]) -> Path:
+    """Return the interpreter of a warm env for the dependency set, building it if needed."""
+    env_dir = POOL_DIR / env_key(dependencies)
+    if not env_python(env_dir).exists():
+        build(normalize(dependencies), env_dir)
+        evict()
+
+    (env_dir / USED_MARKER).write_text(str(time.time()))
+    return env_python(env_dir)
+
+
+def evict():
+    """Keep at most MAX_ENVS environments, dropping the least recently used."""
+    envs = []
+    for env_dir in POOL_DIR.iterdir():
+        marker = env_dir / USED_MARKER
+        if env_dir.is_dir() and not env_dir.name.endswith(".tmp"):
+            last_used = marker.stat().st_mtime if marker.exists() else env_dir.stat().st_mtime
+            envs.append((last_used, env_dir))
+
+    for _, env_dir in sorted(envs, reverse=True)[MAX_ENVS:]:
+        shutil.rmtree(env_dir, ignore_errors=True)
+
+
+def command(script_path: Path, code: str) -> list[str]:
+    """Build the launch command, preferring a warm pooled interpreter over `uv run`."""
+    try:
+        python = acquire(script_dependencies(code))
+    except (ValueError, SyntaxError, OSError, subprocess.CalledProcessError):
+        return ["uv", "run", str(script_path)]
+    return [str(python), str(script_path)]
+
+
+def run_harness(code: str, harness: str, args: list[str], timeout: float) -> subprocess.CompletedProcess:
+    """Run a helper script in the same environment as code by giving it code's PEP 723 header."""
+    source = script_header(code) + "\n" + harness
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
+        f.write(source)
+        harness_file = Path(f.name)
+
+    try:
+        return subprocess.run(
+            command(harness_file, source) + args,
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+    finally:
+        harness_file.unlink(missing_ok=True)
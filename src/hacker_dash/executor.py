@@ -1,17 +1,188 @@
+import os
+import re
+import select
 import subprocess
+import sys
 import tempfile
+import time
 from pathlib import Path
 from rich.console import Console
-from . import injector
+from . import envpool, healer, injector, library, profiler, tracing, validator
 
 console = Console()
 MAX_RETRIES = 2
+OUTPUT_TAIL_BYTES = 64 * 1024  # How much trailing terminal output to keep for crash reports
+
+ANSI_ESCAPE = re.compile(r'\x1b(\[[0-?]*[ -/]*[@-~]|\][^\x07]*\x07|[@-Z\\-_])')
+ALT_SCREEN_EXIT = "\x1b[?1049l"
+
+
+def _copy_winsize(fd: int):
+    import fcntl
+    import termios
+
+    if sys.stdout.isatty():
+        winsize = fcntl.ioctl(sys.stdout.fileno(), termios.TIOCGWINSZ, b"\0" * 8)
+        fcntl.ioctl(fd, termios.TIOCSWINSZ, winsize)
+
+
+def _clean_output(raw: bytes) -> str:
+    """Recover the plain-text crash report from the tail of a terminal session."""
+    text = raw.decode("utf-8", errors="replace")
+    # Textual prints the traceback after leaving the alternate screen
+    if ALT_SCREEN_EXIT in text:
+        text = text.rsplit(ALT_SCREEN_EXIT, 1)[1]
+    text = ANSI_ESCAPE.sub("", text)
+    return text.replace("\r\n", "\n").replace("\r", "\n").strip()
+
+
+def spawn_in_pty(cmd: list[str]) -> tuple[int, int]:
+    """Start cmd on a new pseudo-terminal, returning (pid, master fd)."""
+    import pty
+
+    pid, master = pty.fork()
+    if pid == 0:
+        try:
+            os.execvp(cmd[0], cmd)
+        finally:
+            os._exit(127)
+    return pid, master
+
+
+def wait_result(cmd: list[str], pid: int, tail: bytes) -> subprocess.CompletedProcess:
+    """Reap a dashboard started by spawn_in_pty, with its crash report recovered from the output tail."""
+    _, status = os.waitpid(pid, 0)
+    returncode = os.waitstatus_to_exitcode(status)
+    output = _clean_output(bytes(tail))
+    # Textual prints handler exceptions and still exits 0, so treat a traceback as a crash
+    if returncode == 0 and "Traceback (most recent call last)" in output:
+        returncode = 1
+    return subprocess.CompletedProcess(cmd, returncode, stderr=output)
+
+
+def _run_in_pty(cmd: list[str]) -> subprocess.CompletedProcess:
+    """Run cmd on a pseudo-terminal, relaying it to ours and keeping a bounded output tail."""
+    import signal
+    import termios
+    import tty
+
+    pid, master = spawn_in_pty(cmd)
+    _copy_winsize(master)
+    old_handler = signal.signal(signal.SIGWINCH, lambda *_: _copy_winsize(master))
+
+    stdin_fd = sys.stdin.fileno()
+    old_mode = None
+    if os.isatty(stdin_fd):
+        old_mode = termios.tcgetattr(stdin_fd)
+        tty.setraw(stdin_fd)
+
+    tail = bytearray()
+    fds = [master, stdin_fd]
+    try:
+        while True:
+            ready, _, _ = select.select(fds, [], [])
+            if master in ready:
+                try:
+                    data = os.read(master, 4096)
+                except OSError:  # EIO once the child side closes
+                    data = b""
+                if not data:
+                    break
+                os.write(sys.stdout.fileno(), data)
+                tail += data
+                del tail[:-OUTPUT_TAIL_BYTES]
+            if stdin_fd in ready:
+                data = os.read(stdin_fd, 4096)
+                if data:
+                    os.write(master, data)
+                else:
+                    fds.remove(stdin_fd)
+    finally:
+        if old_mode is not None:
+            termios.tcsetattr(stdin_fd, termios.TCSAFLUSH, old_mode)
+        signal.signal(signal.SIGWINCH, old_handler)
+        os.close(master)
+
+    return wait_result(cmd, pid, tail)
+
+
+def launch(cmd: list[str]) -> subprocess.CompletedProcess:
+    """Run a dashboard interactively, returning its crash output from the same run."""
+    if os.name == "posix":
+        return _run_in_pty(cmd)
+
+    # No pty support: fall back to re-running with capture to get the error
+    result = subprocess.run(cmd)
+    if result.returncode != 0:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    return result
+
+def run_dashboard(code: str, api_key: str, user_prompt: str, profile_budget: dict = None, fixer=None,
+                  launcher=None):
+    """Launch the dashboard, healing crashes; with a profile_budget, CPU-hungry code is sent back first.
+
+    fixer has brain.fix_dashboard's signature (the default); the CLI passes a daemon client's instead.
+    launcher runs the launch command and returns its CompletedProcess, like launch(). By default
+    every attempt runs in one warm supervisor process (see supervisor.py); broadcast mode passes a
+    Broadcaster's run instead.
+    Scripts that launch successfully are saved to the library along with the heals that got them there.
+    Returns the code that launched, without the injected stats panel, or None if healing gave up.
+    """
+    from contextlib import nullcontext
+    from . import supervisor
+
+    if fixer is None:
+        from . import brain
+        fixer = brain.fix_dashboard
+    heals = []
+    launched = failure = None
+    with nullcontext(launcher) if launcher else supervisor.SupervisedLauncher() as launcher:
+        # A loop rather than recursion, so each attempt's code is dropped once its fix is in hand
+        for retry_count in range(MAX_RETRIES + 1):
+            with tracing.span("attempt", retry_count=retry_count):
+                code, launched, failure = _run_attempt(
+                    code, api_key, user_prompt, retry_count, profile_budget, fixer, heals, launcher
+                )
+            if code is None:
+                break
+    # Reported once the supervisor has handed the terminal back
+    if failure is not None:
+        console.print(f"[red]✗ Failed after {MAX_RETRIES} attempts.[/red]")
+        console.print(f"[red]Error:[/red]\n{failure}")
+    return launched
+
+def _heal_record(problem: str, method: str, error: str, rule: str = None) -> dict:
+    lines = [line for line in error.strip().splitlines() if line.strip()]
+    return {"problem": problem, "method": method, "rule": rule, "error": lines[-1] if lines else ""}
+
+def _budget_problems(code: str, script_path: Path, budget: dict) -> str | None:
+    """Describe how the dashboard exceeds the budget, or None if it fits (or couldn't be measured)."""
+    with tracing.span("profile") as span:
+        try:
+            measurements = profiler.profile(code, script_path)
+        except profiler.ProfileError as e:
+            # Inconclusive; crashes are the launch's and healer's business
+            span.set(error=str(e))
+            return None
+        problems = profiler.over_budget(measurements, budget)
+        span.set(**measurements, over_budget=sorted(problems))
+    if not problems:
+        return None
+    return profiler.describe(measurements, problems)
+
+def _run_attempt(code: str, api_key: str, user_prompt: str, retry_count: int, profile_budget: dict, fixer,
+                 heals: list, launcher) -> tuple[str | None, str | None, str | None]:
+    """Returns (fixed code to try next, None, None), (None, launched source, None) when done,
+    or (None, None, error) out of retries."""
+    # The library keeps the dashboard itself; fixes of an earlier attempt carry its injected panel
+    source = injector.remove_stats_panel(code)
 
-def run_dashboard(code: str, api_key: str, user_prompt: str, retry_count: int = 0):
-    from . import brain
-    
     # Inject stats panel into the code
-    code = injector.inject_stats_panel(code)
+    with tracing.span("inject") as span:
+        code, injected = injector.inject_stats_panel(code)
+        span.set(injected=injected)
+    if not injected:
+        console.print("[dim]Could not place the stats panel; launching without it.[/dim]")
     
     # Debug save
     Path("debug_injected.py").write_text(code)
@@ -23,29 +194,61 @@ def run_dashboard(code: str, api_key: str, user_prompt: str, retry_count: int =
         temp_file = Path(f.name)
     
     try:
-        # Try running without capture first
-        result = subprocess.run(
-            ["uv", "run", str(temp_file)]
-        )
+        with tracing.span("env_acquire"):
+            cmd = envpool.command(temp_file, code)
+        prepare = getattr(launcher, "prepare", None)
+        # A supervisor warms up its imports while validation runs
+        supervised = bool(prepare and prepare(cmd))
+
+        # Catch broken generations locally before paying for a launch. A supervised launch costs less
+        # than the smoke test's fresh interpreter and reports a crash just as well, so it's skipped there
+        with tracing.span("validate", smoke_test=not supervised) as span:
+            error = validator.validate(code, None if supervised else temp_file)
+            span.set(passed=error is None)
+        # Only worth measuring while there are retries left to spend on a fix
+        if error is None and profile_budget is not None and retry_count < MAX_RETRIES:
+            problems = _budget_problems(code, temp_file, profile_budget)
+            if problems:
+                console.print(f"[yellow]⚠ Dashboard is over its resource budget.[/yellow]")
+                console.print(f"[dim]{problems}[/dim]")
+                console.print(f"[yellow]Optimizing (attempt {retry_count + 1}/{MAX_RETRIES})...[/yellow]")
+                with tracing.span("heal_attempt", attempt=retry_count + 1, method="llm", problem="performance"):
+                    fixed_code = fixer(api_key, code, problems, problem="performance")
+                heals.append(_heal_record("performance", "llm", problems))
+                return fixed_code, None, None
+
+        if error:
+            console.print(f"[yellow]⚠ Pre-flight check failed.[/yellow]")
+            result = subprocess.CompletedProcess([], 1, stderr=error)
+        else:
+            with tracing.span("launch") as span:
+                started = time.monotonic()
+                result = launcher(cmd)
+                span.set(returncode=result.returncode)
+            if result.returncode != 0:
+                console.print(f"[yellow]⚠ Dashboard crashed.[/yellow]")
+            else:
+                library.record_launch(user_prompt, source, heals, time.monotonic() - started, result.returncode)
         
-        # If it failed, re-run with capture to get the error
         if result.returncode != 0:
-            console.print(f"[yellow]⚠ Dashboard crashed. Capturing error...[/yellow]")
-            
-            result = subprocess.run(
-                ["uv", "run", str(temp_file)],
-                capture_output=True,
-                text=True
-            )
-            
             if retry_count < MAX_RETRIES:
                 console.print(f"[yellow]Self-healing (attempt {retry_count + 1}/{MAX_RETRIES})...[/yellow]")
                 
-                fixed_code = brain.fix_dashboard(api_key, code, result.stderr)
-                run_dashboard(fixed_code, api_key, user_prompt, retry_count + 1)
-            else:
-                console.print(f"[red]✗ Failed after {MAX_RETRIES} attempts.[/red]")
-                console.print(f"[red]Error:[/red]\n{result.stderr}")
+                with tracing.span("heal_attempt", attempt=retry_count + 1) as span:
+                    # Known error signatures are fixed locally; everything else goes to the model
+                    healed = healer.heal(code, result.stderr)
+                    if healed:
+                        fixed_code, rule_name = healed
+                        span.set(method="local", rule=rule_name)
+                        console.print(f"[dim]Applied local fix: {rule_name}[/dim]")
+                        heals.append(_heal_record("crash", "local", result.stderr, rule_name))
+                    else:
+                        span.set(method="llm")
+                        fixed_code = fixer(api_key, code, result.stderr)
+                        heals.append(_heal_record("crash", "llm", result.stderr))
+                return fixed_code, None, None
+            return None, None, result.stderr
+        return None, source, None
     
     finally:
         if temp_file.exists():
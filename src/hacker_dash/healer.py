@@ -0,0 +1,122 @@
+import ast
+import re
+
+from . import stats
+
+# Where names that generated code commonly forgets to import live
+KNOWN_IMPORTS = {
+    **{name: "textual.app" for name in ("App", "ComposeResult")},
+    **{name: "textual.widgets" for name in (
+        "Static", "Header", "Footer", "Label", "Button", "DataTable", "Sparkline", "ProgressBar",
+        "Log", "RichLog", "Digits", "Input", "Placeholder", "Rule", "Tabs", "TabbedContent",
+        "TabPane", "Tree", "ListView", "ListItem", "Pretty", "Markdown", "Switch", "Checkbox",
+    )},
+    **{name: "textual.containers" for name in (
+        "Container", "Horizontal", "Vertical", "Grid", "VerticalScroll", "HorizontalScroll",
+        "ScrollableContainer", "Center", "Middle",
+    )},
+    "reactive": "textual.reactive",
+    "Timer": "textual.timer",
+    "datetime": "datetime",
+    "deque": "collections",
+}
+KNOWN_MODULES = {"psutil", "random", "time", "math", "os", "platform", "socket", "asyncio", "json"}
+
+RULES = []
+
+
+def rule(name: str, pattern: str):
+    """Register a fix for tracebacks matching pattern; fixes return new code or None."""
+    def decorator(fix):
+        RULES.append((name, re.compile(pattern), fix))
+        return fix
+    return decorator
+
+
+def _insert_import(code: str, statement: str) -> str:
+    """Insert an import after the last top-level import."""
+    tree = ast.parse(code)
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    lines = code.splitlines(keepends=True)
+    index = imports[-1].end_lineno if imports else 0
+    lines.insert(index, statement + "\n")
+    return "".join(lines)
+
+
+def _remove_from_import(code: str, module: str, name: str) -> str:
+    """Drop name from `from module import ...`, removing the statement if it empties."""
+    tree = ast.parse(code)
+    lines = code.splitlines(keepends=True)
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module == module and any(a.name == name for a in node.names):
+            kept = [a for a in node.names if a.name != name]
+            statement = ""
+            if kept:
+                names = ", ".join(a.name + (f" as {a.asname}" if a.asname else "") for a in kept)
+                statement = f"from {module} import {names}\n"
+            lines[node.lineno - 1:node.end_lineno] = [statement]
+            break
+    return "".join(lines)
+
+
+@rule("missing-import", r"NameError: name '(?P<name>\w+)' is not defined")
+def fix_missing_import(code: str, match: re.Match) -> str | None:
+    name = match.group("name")
+    if name in KNOWN_MODULES:
+        return _insert_import(code, f"import {name}")
+    if name in KNOWN_IMPORTS:
+        return _insert_import(code, f"from {KNOWN_IMPORTS[name]} import {name}")
+    return None
+
+
+@rule("wrong-import-module", r"ImportError: cannot import name '(?P<name>\w+)' from '(?P<module>[\w.]+)'")
+def fix_wrong_import_module(code: str, match: re.Match) -> str | None:
+    name, module = match.group("name", "module")
+    correct = KNOWN_IMPORTS.get(name)
+    if correct is None or correct == module:
+        return None
+    code = _remove_from_import(code, module, name)
+    return _insert_import(code, f"from {correct} import {name}")
+
+
+@rule("invalid-css-property", r"Invalid CSS property '(?P<name>[\w-]+)'")
+def fix_invalid_css_property(code: str, match: re.Match) -> str | None:
+    # Declarations sit one per line in generated CSS strings
+    declaration = re.compile(rf'^[ \t]*{re.escape(match.group("name"))}[ \t]*:[^\n]*\n', re.MULTILINE)
+    return declaration.sub("", code)
+
+
+@rule("cpu-freq-none", r"AttributeError: 'NoneType' object has no attribute '(?P<attr>current|min|max)'")
+def fix_cpu_freq_none(code: str, match: re.Match) -> str | None:
+    # psutil.cpu_freq() returns None on many VMs and containers
+    code = re.sub(r'psutil\.cpu_freq\(\)\.(current|min|max)\b', r'getattr(psutil.cpu_freq(), "\1", 0)', code)
+    for name in re.findall(r'(\w+)\s*=\s*psutil\.cpu_freq\(\)', code):
+        code = re.sub(rf'\b{name}\.(current|min|max)\b', rf'getattr({name}, "\1", 0)', code)
+    return code
+
+
+def heal(code: str, error: str) -> tuple[str, str] | None:
+    """Try each rule against the error; return (fixed code, rule name) for the first that applies."""
+    for name, pattern, fix in RULES:
+        match = None
+        for match in pattern.finditer(error):
+            pass  # The last match is the one closest to the actual failure
+        if match is None:
+            continue
+
+        try:
+            fixed = fix(code, match)
+        except SyntaxError:
+            fixed = None
+        if fixed is None or fixed == code:
+            continue
+        try:
+            compile(fixed, "<healed>", "exec")
+        except SyntaxError:
+            continue
+
+        stats.bump_counter(f"heal_rule:{name}")
+        return fixed, name
+
+    stats.bump_counter("heal_rule:unmatched")
+    return None
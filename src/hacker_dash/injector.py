@@ -1,73 +1,265 @@
+import ast
 import re
-import json
 from pathlib import Path
+from . import stats
 
-STATS_FILE = Path.home() / ".hacker-dash-stats.json"
+REFRESH_INTERVAL = 2  # Seconds between live stats checks in the injected panel
 
-def inject_stats_panel(code: str) -> str:
-    """Inject a stats panel into generated Textual code."""
-    
-    # Load stats
-    stats_data = []
-    if STATS_FILE.exists():
-        stats_data = json.loads(STATS_FILE.read_text())
-    
-    total_calls = len(stats_data)
-    total_tokens = sum(s["total_tokens"] for s in stats_data) if stats_data else 0
-    total_cost = sum(s["cost"] for s in stats_data) if stats_data else 0
-    avg_latency = (sum(s["latency"] for s in stats_data) / len(stats_data)) if stats_data else 0
+METRICS_RUNTIME = (Path(__file__).parent / "metrics_runtime.py").read_text()
+# Including the blank line inject_metrics_runtime puts before it, so removal restores the original
+METRICS_BLOCK = re.compile(
+    r'\n?# --- hacker-dash metrics runtime ---\n.*?# --- end hacker-dash metrics runtime ---\n', re.DOTALL
+)
+
+def inject_stats_panel(code: str) -> tuple[str, bool]:
+    """Inject a stats panel into generated Textual code.
+
+    Returns the new code and whether injection succeeded; on failure the
+    code is returned unchanged so it can still be launched.
+    """
     
+    # No values are baked in, so injecting the same code twice gives identical output
     stats_widget = f'''
 # Injected stats widget
 class StatsPanel(Static):
-    """Display API usage statistics."""
+    """Display API usage statistics, refreshed live from hacker-dash's aggregates file."""
+    
+    LIVE_FILE = {str(stats.LIVE_FILE)!r}
     
     def __init__(self):
-        stats_text = f"""[cyan]╔═══ API STATS ═══╗[/cyan]
-[green]Calls:[/green] {total_calls}
-[green]Tokens:[/green] {total_tokens:,}
-[green]Cost:[/green] ${total_cost:.4f}
-[green]Latency:[/green] {avg_latency:.2f}s
+        super().__init__(self._format_stats({{"calls": 0, "total_tokens": 0, "cost": 0.0, "avg_latency": 0.0}}))
+        self._live_mtime = None
+        self._refresh_stats()
+    
+    def on_mount(self) -> None:
+        self.set_interval({REFRESH_INTERVAL}, self._refresh_stats)
+    
+    def _refresh_stats(self) -> None:
+        import json
+        import os
+        
+        # A stat() per tick; the small aggregates file is only read when it changes
+        try:
+            mtime = os.stat(self.LIVE_FILE).st_mtime_ns
+            if mtime == self._live_mtime:
+                return
+            self._live_mtime = mtime
+            with open(self.LIVE_FILE) as f:
+                self.update(self._format_stats(json.load(f)))
+        except (OSError, ValueError, KeyError):
+            pass
+    
+    @staticmethod
+    def _format_stats(s) -> str:
+        return f"""[cyan]╔═══ API STATS ═══╗[/cyan]
+[green]Calls:[/green] {{s["calls"]}}
+[green]Tokens:[/green] {{s["total_tokens"]:,}}
+[green]Cost:[/green] ${{s["cost"]:.4f}}
+[green]Latency:[/green] {{s["avg_latency"]:.2f}}s
 [cyan]╚═════════════════╝[/cyan]"""
-        super().__init__(stats_text)
 '''
     
-    # Find the imports section and add Static if not present
-    if "from textual.widgets import" in code:
-        # Add Static to existing imports
-        code = re.sub(
-            r'(from textual\.widgets import [^)]+)',
-            r'\1, Static',
-            code
-        )
-        # Remove duplicate if it was already there
-        code = re.sub(r'Static,\s*Static', 'Static', code)
-    else:
-        # Add new import line after textual.app import
-        code = re.sub(
-            r'(from textual\.app import [^\n]+\n)',
-            r'\1from textual.widgets import Static\n',
-            code
-        )
-    
-    # Find the Dashboard class and inject stats widget before it
-    code = re.sub(
-        r'(class \w+\(App\):)',
-        f'{stats_widget}\n\\1',
-        code
+    code, injected = _splice(METRICS_BLOCK.sub("", code), stats_widget)
+    return inject_metrics_runtime(code), injected
+
+
+def remove_stats_panel(code: str) -> str:
+    """Undo inject_stats_panel: the scaffolding the model is told not to write, and that the
+    library and heal prompts shouldn't carry. Healed code keeps whatever it inherited, so this
+    works on any injected script, not only the one returned by the last injection."""
+    code = METRICS_BLOCK.sub("", code)
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return code
+
+    lines = code.splitlines(keepends=True)
+    for node in tree.body:
+        if not (isinstance(node, ast.ClassDef) and node.name == "StatsPanel"):
+            continue
+        start = (node.decorator_list[0].lineno if node.decorator_list else node.lineno) - 1
+        end = node.end_lineno
+        if start > 0 and lines[start - 1].strip() == "# Injected stats widget":
+            start -= 1
+            if start > 0 and not lines[start - 1].strip():
+                start -= 1
+            # The Static import injection adds goes right before the widget
+            if start > 0 and lines[start - 1] == "from textual.widgets import Static\n":
+                start -= 1
+            if end < len(lines) and not lines[end].strip():
+                end += 1
+        for index in range(start, end):
+            lines[index] = ""
+
+    for node in ast.walk(tree):
+        # A compose that only yields the panel was added by injection along with it
+        if (isinstance(node, ast.FunctionDef) and node.name == "compose" and len(node.body) == 1
+                and _is_yield_of(node.body[0], "StatsPanel")):
+            start = node.lineno - 1
+            if start > 0 and not lines[start - 1].strip():
+                start -= 1
+            for index in range(start, node.end_lineno):
+                lines[index] = ""
+        elif (isinstance(node, ast.Expr) and _is_yield_of(node, "StatsPanel")
+                and node.lineno == node.end_lineno and lines[node.lineno - 1].strip() == "yield StatsPanel()"):
+            lines[node.lineno - 1] = ""
+    return "".join(lines)
+
+
+def _uses_metrics(tree: ast.Module) -> bool:
+    """True if the code reads a `metrics` name it doesn't define itself."""
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            if any((alias.asname or alias.name) == "metrics" for alias in node.names):
+                return False
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and node.name == "metrics":
+            return False
+        elif isinstance(node, ast.Assign):
+            if any(isinstance(target, ast.Name) and target.id == "metrics" for target in node.targets):
+                return False
+
+    return any(
+        isinstance(node, ast.Name) and node.id == "metrics" and isinstance(node.ctx, ast.Load)
+        for node in ast.walk(tree)
+    )
+
+
+def inject_metrics_runtime(code: str) -> str:
+    """Add the shared metrics sampler after the imports if the code uses `metrics`."""
+    code = METRICS_BLOCK.sub("", code)
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return code
+    if not _uses_metrics(tree):
+        return code
+
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    lines = code.splitlines(keepends=True)
+    anchor = imports[-1].end_lineno if imports else 0
+    lines.insert(anchor, "\n" + METRICS_RUNTIME)
+    return "".join(lines)
+
+
+def _is_app_class(node: ast.ClassDef, app_names: set) -> bool:
+    for base in node.bases:
+        if isinstance(base, ast.Subscript):
+            base = base.value  # App[ReturnType]
+        name = base.attr if isinstance(base, ast.Attribute) else getattr(base, "id", None)
+        if name in app_names:
+            return True
+    return False
+
+
+def _find_target_app(tree: ast.Module) -> ast.ClassDef | None:
+    """Pick the App subclass the script actually runs, else the last one defined."""
+    app_names = {"App"}
+    apps = []
+    for node in tree.body:
+        # Names accumulate so subclasses of an App subclass are found too
+        if isinstance(node, ast.ClassDef) and _is_app_class(node, app_names):
+            app_names.add(node.name)
+            apps.append(node)
+    if not apps:
+        return None
+
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "run"
+                and isinstance(node.func.value, ast.Call) and isinstance(node.func.value.func, ast.Name)):
+            for app in apps:
+                if app.name == node.func.value.func.id:
+                    return app
+    return apps[-1]
+
+
+def _imports_static(tree: ast.Module) -> bool:
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module == "textual.widgets":
+            if any(alias.name in ("Static", "*") and alias.asname in (None, "Static") for alias in node.names):
+                return True
+    return False
+
+
+def _splice(code: str, stats_widget: str) -> tuple[str, bool]:
+    """Locate every edit from one parse, then splice them in bottom-up so line numbers stay valid."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return code, False
+
+    app = _find_target_app(tree)
+    if app is None:
+        return code, False
+
+    lines = code.splitlines(keepends=True)
+    if lines and not lines[-1].endswith("\n"):
+        lines[-1] += "\n"
+    inserts = []  # (line index, text inserted before it)
+    removals = []  # (start, end) line index ranges to drop
+
+    # Re-injection (e.g. healed code) replaces the old panel instead of duplicating it
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == "StatsPanel":
+            start = (node.decorator_list[0].lineno if node.decorator_list else node.lineno) - 1
+            end = node.end_lineno
+            if start > 0 and lines[start - 1].strip() == "# Injected stats widget":
+                start -= 1
+                # Along with the blank lines the injection wrapped it in, so re-injection is stable
+                if start > 0 and not lines[start - 1].strip():
+                    start -= 1
+                if end < len(lines) and not lines[end].strip():
+                    end += 1
+            removals.append((start, end))
+
+    # Widget class (and the Static import it needs) go right after the top-level imports
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    anchor = imports[-1].end_lineno if imports else app.lineno - 1
+    header = "" if _imports_static(tree) else "from textual.widgets import Static\n"
+    inserts.append((anchor, header + stats_widget + "\n"))
+
+    compose = next(
+        (node for node in app.body
+         if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == "compose"),
+        None
+    )
+    if compose is None:
+        indent = " " * app.body[0].col_offset
+        inserts.append((app.end_lineno, f"\n{indent}def compose(self):\n{indent}    yield StatsPanel()\n"))
+    elif not _yields_stats_panel(compose):
+        first = compose.body[0]
+        if first.lineno == compose.lineno:
+            # One-line `def compose(self): yield ...` has no block to insert into
+            return code, False
+        target = first
+        for stmt in compose.body:
+            if _is_yield_of(stmt, "Header"):
+                target = stmt
+                break
+        else:
+            # Keep a docstring first
+            if (isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant)
+                    and isinstance(first.value.value, str) and len(compose.body) > 1):
+                target = compose.body[1]
+        indent = " " * target.col_offset
+        inserts.append((target.lineno - 1, f"{indent}yield StatsPanel()\n"))
+
+    for start, end in removals:
+        for index in range(start, end):
+            lines[index] = ""
+    for index, text in sorted(inserts, key=lambda edit: edit[0], reverse=True):
+        lines.insert(index, text)
+
+    return "".join(lines), True
+
+
+def _is_yield_of(stmt: ast.stmt, name: str) -> bool:
+    return (isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Yield)
+            and isinstance(stmt.value.value, ast.Call)
+            and isinstance(stmt.value.value.func, ast.Name) and stmt.value.value.func.id == name)
+
+
+def _yields_stats_panel(compose: ast.FunctionDef) -> bool:
+    return any(
+        isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "StatsPanel"
+        for node in ast.walk(compose)
     )
-    
-    # Find the compose method and add stats panel
-    # Look for "def compose(self):" and inject after the first yield or at the start
-    #compose_pattern = r'(def compose\(self\):.*?)(yield )'
-    if "yield Header()" in code:
-        code = code.replace("yield Header()", "yield StatsPanel()\n        yield Header()")
-    elif "def compose(self)" in code:
-        # Fallback: add after compose definition
-        code = re.sub(
-            r'(def compose\(self\).*?:)\n',
-            r'\1\n        yield StatsPanel()\n',
-            code,
-            flags=re.DOTALL
-        )
-    return code
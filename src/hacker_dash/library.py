@@ -0,0 +1,167 @@
+import hashlib
+import json
+import math
+import re
+import sqlite3
+import time
+from collections import Counter
+from pathlib import Path
+from platformdirs import user_data_dir
+
+from .validator import script_dependencies
+
+LIBRARY_DB = Path(user_data_dir("hacker-dash")) / "library.db"
+
+# Cosine similarity between prompts: above REUSE the old dashboard is offered as-is,
+# above SEED it is handed to the model as a starting point
+REUSE_THRESHOLD = 0.85
+SEED_THRESHOLD = 0.45
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dashboards (
+    id INTEGER PRIMARY KEY,
+    code_hash TEXT NOT NULL UNIQUE,
+    code TEXT NOT NULL,
+    prompts TEXT NOT NULL,
+    dependencies TEXT NOT NULL,
+    heals TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    launches INTEGER NOT NULL DEFAULT 0,
+    runtime REAL NOT NULL DEFAULT 0,
+    last_returncode INTEGER
+);
+"""
+
+STOPWORDS = {
+    "a", "an", "and", "as", "at", "for", "from", "in", "into", "me", "my", "of", "on", "or",
+    "show", "shows", "that", "the", "to", "with", "dashboard", "display", "make", "create", "build",
+}
+
+
+def connect() -> sqlite3.Connection:
+    LIBRARY_DB.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(LIBRARY_DB, timeout=10, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _entry(row: sqlite3.Row) -> dict:
+    entry = dict(row)
+    for name in ("prompts", "dependencies", "heals"):
+        entry[name] = json.loads(entry[name])
+    return entry
+
+
+def record_launch(prompt: str, code: str, heals: list = None, runtime: float = 0.0, returncode: int = 0) -> int:
+    """Store a launched script, or update its entry if this exact code is already in the library."""
+    code_hash = hashlib.sha256(code.encode()).hexdigest()
+    try:
+        dependencies = script_dependencies(code)
+    except (ValueError, SyntaxError):
+        dependencies = []
+    now = time.time()
+
+    conn = connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT id, prompts, heals FROM dashboards WHERE code_hash = ?", (code_hash,)).fetchone()
+        if row is None:
+            cursor = conn.execute(
+                "INSERT INTO dashboards (code_hash, code, prompts, dependencies, heals, created, last_used,"
+                " launches, runtime, last_returncode) VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?)",
+                (code_hash, code, json.dumps([prompt]), json.dumps(dependencies), json.dumps(heals or []),
+                 now, now, runtime, returncode)
+            )
+            dashboard_id = cursor.lastrowid
+        else:
+            # Every prompt that led here is indexed, so rephrasings find it too
+            prompts = json.loads(row["prompts"])
+            if prompt not in prompts:
+                prompts.append(prompt)
+            dashboard_id = row["id"]
+            conn.execute(
+                "UPDATE dashboards SET prompts = ?, heals = ?, last_used = ?, launches = launches + 1,"
+                " runtime = runtime + ?, last_returncode = ? WHERE id = ?",
+                (json.dumps(prompts), json.dumps(json.loads(row["heals"]) + (heals or [])), now,
+                 runtime, returncode, dashboard_id)
+            )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return dashboard_id
+
+
+def get(dashboard_id: int) -> dict | None:
+    conn = connect()
+    try:
+        row = conn.execute("SELECT * FROM dashboards WHERE id = ?", (dashboard_id,)).fetchone()
+    finally:
+        conn.close()
+    return _entry(row) if row else None
+
+
+def entries() -> list[dict]:
+    conn = connect()
+    try:
+        rows = conn.execute("SELECT * FROM dashboards ORDER BY last_used DESC").fetchall()
+    finally:
+        conn.close()
+    return [_entry(row) for row in rows]
+
+
+def _stem(word: str) -> str:
+    # Just enough to match "monitoring"/"monitor" and "resources"/"resource"
+    for suffix in ("ing", "ies", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3 and not word.endswith("ss"):
+            return word[:-len(suffix)] + ("y" if suffix == "ies" else "")
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    words = [_stem(word) for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in STOPWORDS]
+    # Bigrams keep "network stats" closer to "network stats" than to "stats network usage"
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _vector(counts: Counter, idf: dict) -> dict:
+    vector = {term: count * idf.get(term, 0.0) for term, count in counts.items()}
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    return {term: weight / norm for term, weight in vector.items()} if norm else {}
+
+
+def search(prompt: str, limit: int = 5) -> list[tuple[float, dict]]:
+    """Rank library entries by TF-IDF cosine similarity of their prompts to `prompt`."""
+    library = entries()
+    documents = [(entry, Counter(tokenize(text))) for entry in library for text in entry["prompts"]]
+    if not documents:
+        return []
+
+    query = Counter(tokenize(prompt))
+    document_frequency = Counter(term for _, counts in documents for term in counts)
+    total = len(documents) + 1  # The query counts as a document
+    idf = {
+        term: math.log((1 + total) / (1 + document_frequency[term] + (term in query))) + 1
+        for term in set(document_frequency) | set(query)
+    }
+
+    query_vector = _vector(query, idf)
+    best = {}
+    for entry, counts in documents:
+        vector = _vector(counts, idf)
+        score = sum(weight * vector.get(term, 0.0) for term, weight in query_vector.items())
+        if score > best.get(entry["id"], (0.0, None))[0]:
+            best[entry["id"]] = (score, entry)
+    return sorted(best.values(), key=lambda match: match[0], reverse=True)[:limit]
+
+
+def best_match(prompt: str) -> tuple[float, dict] | None:
+    matches = search(prompt, limit=1)
+    if not matches or matches[0][0] < SEED_THRESHOLD:
+        return None
+    return matches[0]
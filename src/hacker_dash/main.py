@@ -1,7 +1,15 @@
+import os
+import sys
 import typer
+from contextlib import contextmanager
+from pathlib import Path
 from rich.console import Console
 from rich.status import Status
-from . import config, brain, executor
+from rich.table import Table
+from . import config, profiler
+
+# Everything else (notably brain, and with it the anthropic SDK) is imported inside the
+# commands that need it, so `hacker-dash config` or `--help` start in a fraction of the time
 
 app = typer.Typer()
 console = Console()
@@ -22,8 +30,19 @@ BANNER = """
 """
 
 @app.command()
-def generate(prompt: str):
+def generate(
+    prompt: str,
+    no_cache: bool = typer.Option(False, "--no-cache", help="Skip the generation cache entirely."),
+    refresh: bool = typer.Option(False, "--refresh", help="Regenerate and overwrite the cached dashboard."),
+    candidates: int = typer.Option(1, "--candidates", min=1, help="Generate N candidates in parallel and launch the first valid one."),
+    trace: bool = typer.Option(False, "--trace", help="Write a Chrome trace of every pipeline phase."),
+    profile_gate: bool = typer.Option(False, "--profile-gate", help="Profile headlessly before launch and send over-budget dashboards back for optimization."),
+    no_library: bool = typer.Option(False, "--no-library", help="Don't reuse or seed from similar dashboards in the local library."),
+    serve: bool = typer.Option(False, "--serve", help="Run the dashboard once and broadcast it to `hacker-dash watch` viewers."),
+):
     """Generate a hacker dashboard from a prompt."""
+    from . import tracing
+
     console.print(BANNER)
     
     try:
@@ -31,18 +50,373 @@ def generate(prompt: str):
     except ValueError as e:
         console.print(f"[red]Error:[/red] {e}")
         return
-    
-    with Status("[cyan]Initializing...[/cyan]", console=console, spinner="dots") as status:
-        def update_status(msg):
-            status.update(f"[cyan]{msg}[/cyan]")
-        
-        code = brain.generate_dashboard(api_key, prompt, status_callback=update_status)
-    
-    console.print("[green]✓[/green] Code generated successfully!")
+
+    if trace:
+        tracing.enable()
+    try:
+        with tracing.span("generate_command", prompt=prompt), _launcher(serve) as launcher:
+            _generate(api_key, prompt, no_cache, refresh, candidates, profile_gate, not no_library, launcher)
+    finally:
+        trace_file = tracing.flush()
+        if trace_file:
+            console.print(f"[dim]Trace written to {trace_file} (open in chrome://tracing or ui.perfetto.dev)[/dim]")
+
+def _library_match(prompt: str, allow_reuse: bool) -> tuple[str | None, str | None]:
+    """Return (code to reuse, code to seed generation with) from the closest library entry."""
+    from . import library
+
+    match = library.best_match(prompt)
+    if match is None:
+        return None, None
+
+    score, entry = match
+    label = f"#{entry['id']} \"{entry['prompts'][0]}\" ({score:.0%} similar, launched {entry['launches']}x)"
+    if allow_reuse and score >= library.REUSE_THRESHOLD:
+        # Non-interactive runs take the free option
+        if not sys.stdin.isatty() or typer.confirm(f"Reuse library dashboard {label}?", default=True):
+            console.print(f"[green]✓[/green] Reusing library dashboard #{entry['id']}")
+            return entry["code"], None
+    console.print(f"[dim]Seeding generation from library dashboard {label}[/dim]")
+    return None, entry["code"]
+
+def _backend():
+    """A running `hacker-dash serve` already has the SDK loaded and a warm client; traces stay in-process."""
+    from . import daemon, tracing
+
+    backend = None if tracing.enabled() else daemon.connect()
+    if backend is None:
+        from . import brain
+        backend = brain
+    return backend
+
+@contextmanager
+def _launcher(serve: bool):
+    """Yield what launches the dashboard: None (run_dashboard's supervised default), or with serve a broadcast."""
+    if not serve:
+        yield None
+        return
+
+    from . import broadcast
+
+    def report(viewers: int):
+        console.print(f"[dim]{viewers} viewer{'s' if viewers != 1 else ''} watching[/dim]")
+
+    try:
+        with broadcast.Broadcaster(on_viewers=report) as host:
+            columns, rows = host.size
+            console.print(
+                f"[green]✓[/green] Broadcasting at {columns}x{rows} on {host.path}; "
+                "run `hacker-dash watch` in other terminals (Ctrl+C stops)"
+            )
+            yield host.run
+    except broadcast.BroadcastError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+
+def _generate(api_key: str, prompt: str, no_cache: bool, refresh: bool, candidates: int, profile_gate: bool,
+              use_library: bool, launcher):
+    from . import executor
+
+    code, seed = None, None
+    if use_library:
+        code, seed = _library_match(prompt, allow_reuse=not (no_cache or refresh))
+
+    backend = _backend()
+
+    generated = None
+    if code is None:
+        with Status("[cyan]Initializing...[/cyan]", console=console, spinner="dots") as status:
+            def update_status(msg):
+                status.update(f"[cyan]{msg}[/cyan]")
+
+            code = backend.generate_dashboard(
+                api_key, prompt, status_callback=update_status,
+                use_cache=not no_cache, refresh=refresh, candidates=candidates, seed=seed
+            )
+        generated = code
+        console.print("[green]✓[/green] Code generated successfully!")
+
     console.print("[cyan]━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━[/cyan]")
     console.print("[magenta]🚀 Launching dashboard...[/magenta]")
     
-    executor.run_dashboard(code, api_key, prompt)
+    launched = executor.run_dashboard(
+        code, api_key, prompt,
+        profile_budget=profiler.DEFAULT_BUDGET if profile_gate else None, fixer=backend.fix_dashboard,
+        launcher=launcher
+    )
+    # Next time the same request gets the healed version straight from the cache
+    if generated is not None and launched is not None and launched != generated and not no_cache:
+        from . import brain, cache
+        cache.put(brain.generation_cache_key(prompt, seed), launched)
+
+@app.command()
+def refine(
+    request: str = typer.Argument(..., help="The change to make, e.g. \"make the CPU panel a sparkline\"."),
+    dashboard: int = typer.Option(None, "--id", help="Library dashboard to refine (default: the last one launched)."),
+    trace: bool = typer.Option(False, "--trace", help="Write a Chrome trace of every pipeline phase."),
+    profile_gate: bool = typer.Option(False, "--profile-gate", help="Profile headlessly before launch and send over-budget dashboards back for optimization."),
+    serve: bool = typer.Option(False, "--serve", help="Run the dashboard once and broadcast it to `hacker-dash watch` viewers."),
+):
+    """Edit the last dashboard with targeted changes instead of regenerating it."""
+    from . import executor, library, tracing
+
+    try:
+        api_key = config.get_api_key()
+    except ValueError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        return
+
+    if dashboard is None:
+        recent = library.entries()
+        entry = recent[0] if recent else None
+    else:
+        entry = library.get(dashboard)
+    if entry is None:
+        console.print("[red]Error:[/red] Nothing to refine yet; launch a dashboard with `hacker-dash generate` first.")
+        raise typer.Exit(1)
+
+    if trace:
+        tracing.enable()
+    try:
+        with tracing.span("refine_command", request=request, dashboard=entry["id"]), _launcher(serve) as launcher:
+            backend = _backend()
+            with Status(f"[cyan]Refining dashboard #{entry['id']}...[/cyan]", console=console, spinner="dots"):
+                code = backend.refine_dashboard(api_key, entry["code"], request)
+            console.print(f"[green]✓[/green] Dashboard #{entry['id']} refined!")
+            console.print("[magenta]🚀 Launching dashboard...[/magenta]")
+            # Stored under the combined prompt so similarity search finds the refined version
+            executor.run_dashboard(
+                code, api_key, f"{entry['prompts'][0]}; {request}",
+                profile_budget=profiler.DEFAULT_BUDGET if profile_gate else None, fixer=backend.fix_dashboard,
+                launcher=launcher
+            )
+    finally:
+        trace_file = tracing.flush()
+        if trace_file:
+            console.print(f"[dim]Trace written to {trace_file} (open in chrome://tracing or ui.perfetto.dev)[/dim]")
+
+@app.command()
+def batch(
+    prompts_file: Path = typer.Argument(..., exists=True, dir_okay=False, help="JSONL file of {\"prompt\": ..., \"id\": ...} lines."),
+    out: Path = typer.Option(Path("dashboards"), "--out", help="Directory for validated scripts and manifest.jsonl."),
+    concurrency: int = typer.Option(4, "--concurrency", min=1, help="Maximum requests in flight."),
+    rate: float = typer.Option(60.0, "--rate", min=0.1, help="Maximum requests started per minute."),
+    retries: int = typer.Option(5, "--retries", min=0, help="Retries per prompt on 429/529 responses."),
+):
+    """Generate and validate dashboards for many prompts without launching them."""
+    from . import batch as batch_runner, brain
+
+    try:
+        api_key = config.get_api_key()
+    except ValueError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        return
+
+    def report(entry):
+        color = {"ok": "green", "invalid": "yellow"}.get(entry["status"], "red")
+        console.print(f"[{color}]{entry['status']:>7}[/{color}] {entry['id']}  [dim]{entry['latency']:.1f}s[/dim]")
+
+    results = batch_runner.run_batch(
+        prompts_file, out,
+        # The SDK's own retries would skip the rate limiter; batch retries every 429/529 itself
+        generate=lambda prompt: brain.generate_dashboard(api_key, prompt, max_retries=0),
+        concurrency=concurrency, rate=rate / 60, max_retries=retries, on_result=report
+    )
+    ok = sum(entry["status"] == "ok" for entry in results)
+    console.print(f"[green]✓[/green] {ok}/{len(results)} dashboards saved to {out}")
+
+@app.command()
+def profile(
+    script: Path = typer.Argument(..., exists=True, dir_okay=False, help="Dashboard script to profile."),
+    seconds: float = typer.Option(profiler.PROFILE_SECONDS, "--seconds", min=0.5, help="How long to measure after warm-up."),
+    max_cpu: float = typer.Option(profiler.DEFAULT_BUDGET["cpu_percent"], "--max-cpu", help="CPU budget, percent of one core."),
+    max_timers: int = typer.Option(profiler.DEFAULT_BUDGET["timers"], "--max-timers", help="Maximum live timers."),
+    max_ticks: float = typer.Option(profiler.DEFAULT_BUDGET["timer_ticks_per_sec"], "--max-ticks", help="Maximum timer callbacks per second."),
+    max_refreshes: float = typer.Option(profiler.DEFAULT_BUDGET["refreshes_per_sec"], "--max-refreshes", help="Maximum widget refreshes per second."),
+    max_memory: int = typer.Option(profiler.DEFAULT_BUDGET["memory_growth_kb"], "--max-memory-kb", help="Maximum resident memory growth in KB."),
+    fix: bool = typer.Option(False, "--fix", help="If over budget, ask for an optimized version and save it next to the script."),
+):
+    """Run a dashboard headlessly and check it against a CPU/refresh budget."""
+    budget = {
+        "cpu_percent": max_cpu, "timers": max_timers, "timer_ticks_per_sec": max_ticks,
+        "refreshes_per_sec": max_refreshes, "memory_growth_kb": max_memory,
+    }
+    code = script.read_text()
+    with Status(f"[cyan]Profiling for {seconds:g}s...[/cyan]", console=console, spinner="dots"):
+        try:
+            measurements = profiler.profile(code, script.resolve(), seconds)
+        except profiler.ProfileError as e:
+            console.print(f"[red]Error:[/red] {e}")
+            raise typer.Exit(2)
+
+    problems = profiler.over_budget(measurements, budget)
+    table = Table(title="[cyan]RENDER BUDGET[/cyan]")
+    for column in ("Metric", "Measured", "Budget"):
+        table.add_column(column)
+    for name, value in measurements.items():
+        limit = budget.get(name)
+        color = "red" if name in problems else "green"
+        table.add_row(name, f"[{color}]{value}[/{color}]", "" if limit is None else str(limit))
+    console.print(table)
+
+    if not problems:
+        console.print("[green]✓[/green] Within budget.")
+        return
+    console.print(f"[red]✗[/red] Over budget: {', '.join(problems)}")
+
+    if fix:
+        from . import brain
+
+        try:
+            api_key = config.get_api_key()
+        except ValueError as e:
+            console.print(f"[red]Error:[/red] {e}")
+            raise typer.Exit(1)
+        with Status("[cyan]Optimizing...[/cyan]", console=console, spinner="dots"):
+            fixed = brain.fix_dashboard(api_key, code, profiler.describe(measurements, problems), problem="performance")
+        out = script.with_name(f"{script.stem}.optimized.py")
+        out.write_text(fixed)
+        console.print(f"[green]✓[/green] Optimized version saved to {out}; run `hacker-dash profile {out}` to re-check.")
+    raise typer.Exit(1)
+
+@app.command(name="library")
+def library_cmd(
+    query: str = typer.Argument(None, help="Rank dashboards by similarity to this prompt."),
+    export: int = typer.Option(None, "--export", help="Write dashboard ID's script to --out."),
+    out: Path = typer.Option(None, "--out", help="Where --export writes (default: dashboard-<ID>.py)."),
+    limit: int = typer.Option(20, "--limit", min=1, help="Maximum rows to list."),
+):
+    """List, search or export dashboards saved after successful launches."""
+    from . import injector, library
+
+    if export is not None:
+        entry = library.get(export)
+        if entry is None:
+            console.print(f"[red]Error:[/red] No library dashboard #{export}")
+            raise typer.Exit(1)
+        out = out or Path(f"dashboard-{export}.py")
+        # Entries are stored without the launch-time scaffolding; add back what the script needs to run
+        out.write_text(injector.inject_metrics_runtime(entry["code"]))
+        console.print(f"[green]✓[/green] Saved dashboard #{export} to {out}")
+        return
+
+    if query:
+        rows = library.search(query, limit=limit)
+    else:
+        rows = [(None, entry) for entry in library.entries()[:limit]]
+
+    table = Table(title="[cyan]DASHBOARD LIBRARY[/cyan]")
+    for column in ("ID", "Prompt", "Similarity", "Launches", "Heals", "Runtime"):
+        table.add_column(column)
+    for score, entry in rows:
+        table.add_row(
+            str(entry["id"]), entry["prompts"][0], "" if score is None else f"{score:.0%}",
+            f"{entry['launches']:,}", f"{len(entry['heals'])}", f"{entry['runtime'] / 60:.1f}m"
+        )
+    console.print(table)
+
+@app.command(name="stats")
+def stats_cmd(
+    compact: int = typer.Option(None, "--compact", help="Drop raw records older than N days (totals are kept)."),
+):
+    """Show API usage statistics."""
+    from . import stats
+
+    if compact is not None:
+        removed = stats.compact(compact)
+        console.print(f"[green]✓[/green] Compacted {removed} raw records.")
+
+    summary = stats.summary()
+    table = Table(title="[cyan]API STATS[/cyan]", show_header=False)
+    table.add_row("[green]Calls[/green]", f"{summary['calls']:,}")
+    table.add_row("[green]Prompt tokens[/green]", f"{summary['prompt_tokens']:,}")
+    table.add_row("[green]Completion tokens[/green]", f"{summary['completion_tokens']:,}")
+    table.add_row(
+        "[green]Prompt cache write/read[/green]",
+        f"{summary['cache_creation_tokens']:,} / {summary['cache_read_tokens']:,}"
+    )
+    table.add_row("[green]Cost[/green]", f"${summary['cost']:.4f}")
+    table.add_row("[green]Latency avg[/green]", f"{summary['avg_latency']:.2f}s")
+    table.add_row(
+        "[green]Latency p50/p95/p99[/green]",
+        f"{summary['p50_latency']:.2f}s / {summary['p95_latency']:.2f}s / {summary['p99_latency']:.2f}s"
+    )
+    table.add_row("[green]Cache hits/misses[/green]", f"{summary['cache_hits']} / {summary['cache_misses']}")
+    console.print(table)
+
+    by_kind = Table(title="[cyan]BY KIND[/cyan]")
+    for column in ("Kind", "Calls", "Avg output tokens", "Avg latency", "p95 latency", "Cost"):
+        by_kind.add_column(column)
+    for kind in stats.kinds():
+        s = stats.summary(kind)
+        by_kind.add_row(
+            kind, f"{s['calls']:,}", f"{s['completion_tokens'] / s['calls']:.0f}",
+            f"{s['avg_latency']:.2f}s", f"{s['p95_latency']:.2f}s", f"${s['cost']:.4f}"
+        )
+    console.print(by_kind)
+
+    provider_names = stats.providers()
+    if provider_names:
+        provider_table = Table(title="[cyan]PROVIDERS[/cyan]")
+        for column in ("Provider", "Calls", "p50 latency", "p95 latency", "p99 latency"):
+            provider_table.add_column(column)
+        for name in provider_names:
+            latency = stats.provider_latency(name)
+            provider_table.add_row(
+                name, f"{latency['calls']:,}", f"{latency['p50_latency']:.2f}s",
+                f"{latency['p95_latency']:.2f}s", f"{latency['p99_latency']:.2f}s"
+            )
+        console.print(provider_table)
+
+    condensed = stats.counters("heal_error_tokens:")
+    if condensed:
+        error_table = Table(title="[cyan]HEAL ERROR CONDENSATION[/cyan]", show_header=False)
+        error_table.add_row("[green]Heals[/green]", f"{condensed.get('heal_error_tokens:heals', 0):,}")
+        error_table.add_row(
+            "[green]Error tokens raw/sent[/green]",
+            f"{condensed.get('heal_error_tokens:raw', 0):,} / {condensed.get('heal_error_tokens:condensed', 0):,}"
+        )
+        console.print(error_table)
+
+    rules = stats.counters("heal_rule:")
+    if rules:
+        heal_table = Table(title="[cyan]LOCAL HEAL RULES[/cyan]")
+        heal_table.add_column("Rule")
+        heal_table.add_column("Fired")
+        for name, count in rules.items():
+            heal_table.add_row(name.removeprefix("heal_rule:"), f"{count:,}")
+        console.print(heal_table)
+
+@app.command()
+def serve(
+    stop: bool = typer.Option(False, "--stop", help="Stop the running daemon."),
+):
+    """Keep the API client and dashboard environments warm for other hacker-dash commands."""
+    from . import daemon
+
+    if stop:
+        client = daemon.connect()
+        if client is None:
+            console.print("[yellow]No daemon is running.[/yellow]")
+            return
+        client.shutdown()
+        console.print("[green]✓[/green] Daemon stopped.")
+        return
+
+    try:
+        daemon.serve(on_ready=lambda path: console.print(f"[green]✓[/green] Serving on {path} (Ctrl+C to stop)"))
+    except daemon.DaemonError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+    except KeyboardInterrupt:
+        pass
+
+@app.command()
+def watch():
+    """Watch a dashboard another terminal is broadcasting with --serve (q or Ctrl+C to detach)."""
+    # Hand the terminal to a bare interpreter running only the viewer loop; the CLI's own imports
+    # (typer, rich) would otherwise roughly double the memory of every viewer
+    os.execv(sys.executable, [sys.executable, "-m", "hacker_dash.broadcast"])
 
 @app.command(name="config")
 def config_cmd():
@@ -0,0 +1,106 @@
+# --- hacker-dash metrics runtime ---
+# Injected into generated dashboards: one background thread samples system metrics
+# into a shared snapshot so widgets never block the event loop polling psutil.
+# Imports stay inside the methods: a top-level one would become the script's last import,
+# where import fixes get inserted, and those would be lost with this block on re-injection.
+
+
+class _MetricsSampler:
+    def __init__(self, interval: float = 1.0):
+        import threading
+
+        self.interval = interval
+        self._snapshot = {}
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._thread = None
+        self._previous = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        import threading
+
+        with self._lock:
+            if self._thread is not None:
+                return
+            try:
+                import psutil
+            except ImportError:
+                return
+            # First sample is taken inline (all non-blocking calls) so snapshot() is never empty
+            psutil.cpu_percent(interval=None, percpu=True)
+            self._snapshot, self._previous = self._sample(psutil, None)
+            self._thread = threading.Thread(target=self._run, args=(psutil,), name="hacker-dash-metrics", daemon=True)
+            self._thread.start()
+
+    def snapshot(self) -> dict:
+        """Latest sample; cheap enough to call from any set_interval callback."""
+        self.start()
+        with self._lock:
+            return dict(self._snapshot)
+
+    def subscribe(self, callback):
+        """Call callback(snapshot) on the caller's event loop after every sample."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        self._subscribers.append((loop, callback))
+        self.start()
+
+    def stop(self):
+        """End the sampling thread (a supervisor calls this once the dashboard has exited)."""
+        self._stopped.set()
+        self._subscribers.clear()
+
+    def _run(self, psutil):
+        while not self._stopped.wait(self.interval):
+            sample, self._previous = self._sample(psutil, self._previous)
+            with self._lock:
+                self._snapshot = sample
+            for loop, callback in list(self._subscribers):
+                try:
+                    loop.call_soon_threadsafe(callback, dict(sample))
+                except RuntimeError:  # Loop closed
+                    self._subscribers.remove((loop, callback))
+
+    def _sample(self, psutil, previous):
+        import time
+
+        now = time.monotonic()
+        net = psutil.net_io_counters()
+        disk = psutil.disk_io_counters()
+        memory = psutil.virtual_memory()
+        freq = psutil.cpu_freq()
+
+        sample = {
+            "timestamp": time.time(),
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "per_cpu_percent": psutil.cpu_percent(interval=None, percpu=True),
+            "cpu_count": psutil.cpu_count(),
+            "cpu_freq_mhz": freq.current if freq else 0.0,
+            "memory_percent": memory.percent,
+            "memory_used": memory.used,
+            "memory_total": memory.total,
+            "swap_percent": psutil.swap_memory().percent,
+            "disk_percent": psutil.disk_usage("/").percent,
+            "net_bytes_sent": net.bytes_sent if net else 0,
+            "net_bytes_recv": net.bytes_recv if net else 0,
+            "net_sent_per_sec": 0.0,
+            "net_recv_per_sec": 0.0,
+            "disk_read_per_sec": 0.0,
+            "disk_write_per_sec": 0.0,
+        }
+        if previous:
+            then, old_net, old_disk = previous
+            elapsed = max(now - then, 1e-6)
+            if net and old_net:
+                sample["net_sent_per_sec"] = (net.bytes_sent - old_net.bytes_sent) / elapsed
+                sample["net_recv_per_sec"] = (net.bytes_recv - old_net.bytes_recv) / elapsed
+            if disk and old_disk:
+                sample["disk_read_per_sec"] = (disk.read_bytes - old_disk.read_bytes) / elapsed
+                sample["disk_write_per_sec"] = (disk.write_bytes - old_disk.write_bytes) / elapsed
+        return sample, (now, net, disk)
+
+
+metrics = _MetricsSampler()
+# --- end hacker-dash metrics runtime ---
@@ -0,0 +1,62 @@
+import re
+
+EDIT_BLOCK = re.compile(
+    r'<<<<<<< SEARCH\n(?P<search>.*?)\n?=======\n(?P<replace>.*?)\n?>>>>>>> REPLACE',
+    re.DOTALL
+)
+
+
+class PatchError(ValueError):
+    pass
+
+
+def parse_edit_blocks(text: str) -> list[tuple[str, str]]:
+    blocks = [(m.group("search"), m.group("replace")) for m in EDIT_BLOCK.finditer(text)]
+    if not blocks:
+        raise PatchError("No SEARCH/REPLACE blocks found in response")
+    return blocks
+
+
+def _find_loose(code: str, search: str) -> tuple[int, int] | None:
+    """Find search in code ignoring trailing whitespace and uniform indentation drift."""
+    code_lines = code.splitlines(keepends=True)
+    search_lines = [line.strip() for line in search.splitlines()]
+    n = len(search_lines)
+
+    matches = [
+        i for i in range(len(code_lines) - n + 1)
+        if [line.strip() for line in code_lines[i:i + n]] == search_lines
+    ]
+    if len(matches) != 1:
+        return None
+
+    start = sum(len(line) for line in code_lines[:matches[0]])
+    end = start + sum(len(line) for line in code_lines[matches[0]:matches[0] + n])
+    return start, end
+
+
+def apply_edit_blocks(code: str, blocks: list[tuple[str, str]]) -> str:
+    """Apply SEARCH/REPLACE blocks in order; each search must match exactly one place."""
+    for search, replace in blocks:
+        count = code.count(search) if search else 0
+        if count == 1:
+            code = code.replace(search, replace, 1)
+            continue
+        if count > 1:
+            raise PatchError(f"SEARCH block matches {count} places:\n{search}")
+
+        span = _find_loose(code, search) if search.strip() else None
+        if span is None:
+            raise PatchError(f"SEARCH block not found in code:\n{search}")
+
+        start, end = span
+        # Keep the file's own indentation when the model's block drifted
+        original = code[start:end]
+        indent = original[:len(original) - len(original.lstrip())]
+        search_indent = search[:len(search) - len(search.lstrip())]
+        lines = [
+            indent + line[len(search_indent):] if line.startswith(search_indent) else line
+            for line in replace.splitlines()
+        ]
+        code = code[:start] + "\n".join(lines) + ("\n" if original.endswith("\n") else "") + code[end:]
+    return code
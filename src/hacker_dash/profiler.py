@@ -0,0 +1,148 @@
+import json
+import subprocess
+from pathlib import Path
+
+from . import envpool
+
+PROFILE_SECONDS = 5.0
+WARMUP_SECONDS = 1.0
+
+# Defaults sized for a shared jump host: a dashboard should idle well under a quarter of a core
+DEFAULT_BUDGET = {
+    "cpu_percent": 25.0,
+    "timers": 20,
+    "timer_ticks_per_sec": 50.0,
+    "refreshes_per_sec": 100.0,
+    "memory_growth_kb": 50_000,
+}
+
+# Mounts the App headlessly, counts timers, ticks, widget refreshes and frames by wrapping
+# Textual internals, and prints the measurements as JSON on the last stdout line
+PROFILE_HARNESS = '''
+import asyncio
+import json
+import runpy
+import sys
+import time
+import weakref
+from textual.app import App
+from textual.timer import Timer
+from textual.widget import Widget
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+counts = {{"ticks": 0, "refreshes": 0, "frames": 0}}
+timers = weakref.WeakSet()
+
+def counting(cls, name, key):
+    original = getattr(cls, name, None)
+    if original is None:
+        return
+    def wrapper(self, *args, **kwargs):
+        counts[key] += 1
+        return original(self, *args, **kwargs)
+    setattr(cls, name, wrapper)
+
+original_timer_init = Timer.__init__
+def timer_init(self, *args, **kwargs):
+    original_timer_init(self, *args, **kwargs)
+    timers.add(self)
+Timer.__init__ = timer_init
+
+original_tick = Timer._tick
+async def tick(self, *args, **kwargs):
+    counts["ticks"] += 1
+    return await original_tick(self, *args, **kwargs)
+Timer._tick = tick
+
+counting(Widget, "refresh", "refreshes")
+counting(App, "_display", "frames")
+
+def max_rss_kb():
+    if resource is None:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+namespace = runpy.run_path(sys.argv[1], run_name="__profile__")
+apps = [v for v in namespace.values() if isinstance(v, type) and issubclass(v, App) and v is not App]
+if not apps:
+    sys.exit("No textual App subclass found in script")
+
+async def main():
+    app = apps[-1]()
+    async with app.run_test(headless=True, size=(120, 40)) as pilot:
+        await pilot.pause({warmup})
+        before = dict(counts)
+        rss_before = max_rss_kb()
+        cpu_before = time.process_time()
+        wall_before = time.perf_counter()
+
+        await pilot.pause({seconds})
+
+        wall = time.perf_counter() - wall_before
+        cpu = time.process_time() - cpu_before
+        result = {{
+            "seconds": round(wall, 3),
+            "cpu_seconds": round(cpu, 3),
+            "cpu_percent": round(100 * cpu / wall, 1),
+            "timers": sum(1 for t in timers if t._task is not None and not t._task.done()),
+            "timer_ticks_per_sec": round((counts["ticks"] - before["ticks"]) / wall, 1),
+            "refreshes_per_sec": round((counts["refreshes"] - before["refreshes"]) / wall, 1),
+            "frames_per_sec": round((counts["frames"] - before["frames"]) / wall, 1),
+            "memory_growth_kb": max_rss_kb() - rss_before,
+        }}
+    print(json.dumps(result))
+
+asyncio.run(main())
+'''
+
+
+class ProfileError(RuntimeError):
+    """The dashboard could not be profiled (crashed, hung, or printed no measurements)."""
+
+
+def profile(code: str, script_path: Path, seconds: float = PROFILE_SECONDS) -> dict:
+    """Run the dashboard headlessly for `seconds` and return its resource measurements."""
+    harness = PROFILE_HARNESS.format(warmup=WARMUP_SECONDS, seconds=seconds)
+    # Generous timeout: the first run may have to build the script's environment
+    timeout = seconds + WARMUP_SECONDS + 60
+    try:
+        result = envpool.run_harness(code, harness, [str(script_path)], timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise ProfileError(f"Profiling did not finish within {timeout:.0f}s")
+
+    if result.returncode != 0:
+        raise ProfileError(result.stderr.strip() or f"Profiler exited with code {result.returncode}")
+    try:
+        return json.loads(result.stdout.strip().splitlines()[-1])
+    except (IndexError, json.JSONDecodeError):
+        raise ProfileError("Profiler printed no measurements")
+
+
+def over_budget(measurements: dict, budget: dict = None) -> dict:
+    """Return {metric: (measured, limit)} for every metric above its limit."""
+    budget = {**DEFAULT_BUDGET, **(budget or {})}
+    return {
+        name: (measurements[name], limit)
+        for name, limit in budget.items()
+        if limit is not None and measurements.get(name, 0) > limit
+    }
+
+
+def describe(measurements: dict, problems: dict) -> str:
+    """Summarise a failed budget as the 'error' text for a performance fix request."""
+    lines = [f"The dashboard exceeded its resource budget over a {measurements['seconds']:.1f}s headless run:"]
+    for name, (measured, limit) in problems.items():
+        lines.append(f"- {name}: {measured} (budget {limit})")
+    lines.append(
+        f"Other measurements: {measurements['timers']} live timers, "
+        f"{measurements['timer_ticks_per_sec']} timer ticks/s, "
+        f"{measurements['refreshes_per_sec']} widget refreshes/s, "
+        f"{measurements['frames_per_sec']} frames/s, "
+        f"{measurements['cpu_percent']}% CPU."
+    )
+    return "\n".join(lines)
@@ -0,0 +1,276 @@
+import contextvars
+import queue
+import threading
+import time
+
+from . import tracing
+
+RATE_LIMITED = 429
+
+
+class ProviderUnavailable(RuntimeError):
+    """A configured provider can't be used (missing SDK or credentials)."""
+
+
+class Request:
+    """A provider-neutral completion request.
+
+    `context` is sent ahead of `user` and marked cacheable where the provider supports it
+    (heals put the code there); `cache_system` does the same for the system prompt.
+    """
+
+    def __init__(self, system: str, user: str, max_tokens: int, context: str = None, cache_system: bool = False):
+        self.system = system
+        self.user = user
+        self.max_tokens = max_tokens
+        self.context = context
+        self.cache_system = cache_system
+
+
+class Completion:
+    def __init__(self, text: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+                 cache_creation_tokens: int = 0, cache_read_tokens: int = 0, ttft: float = None,
+                 cancelled: bool = False):
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.cache_creation_tokens = cache_creation_tokens
+        self.cache_read_tokens = cache_read_tokens
+        self.ttft = ttft
+        # True when the request lost a hedge race and stopped early; usage is what it consumed
+        self.cancelled = cancelled
+
+
+class Provider:
+    """One model behind one API. Subclasses implement stream()."""
+
+    name = "provider"
+    # USD per 1K tokens: input, cache write, cache read, output
+    prices = (0.0, 0.0, 0.0, 0.0)
+
+    def __init__(self, model: str):
+        self.model = model
+
+    @property
+    def label(self) -> str:
+        return f"{self.name}:{self.model}"
+
+    @property
+    def account(self):
+        """What this provider's rate limit applies to; providers sharing one are limited together."""
+        return self
+
+    def stream(self, request: Request, cancelled: threading.Event, on_text=None) -> Completion:
+        """Run the request, calling on_text(chars_so_far) as text arrives and stopping early once cancelled is set."""
+        raise NotImplementedError
+
+
+class AnthropicProvider(Provider):
+    name = "anthropic"
+    prices = (0.003, 0.00375, 0.0003, 0.015)  # Claude Sonnet
+
+    def __init__(self, client, model: str):
+        super().__init__(model)
+        self.client = client
+
+    @property
+    def account(self):
+        return self.client
+
+    def _system(self, request: Request) -> list:
+        block = {"type": "text", "text": request.system}
+        if request.cache_system:
+            block["cache_control"] = {"type": "ephemeral"}
+        return [block]
+
+    def _messages(self, request: Request) -> list:
+        if request.context is None:
+            return [{"role": "user", "content": request.user}]
+        return [{"role": "user", "content": [
+            {"type": "text", "text": request.context, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": request.user},
+        ]}]
+
+    def stream(self, request: Request, cancelled: threading.Event, on_text=None) -> Completion:
+        start = time.monotonic()
+        ttft = None
+        parts = []
+        chars = 0
+
+        with self.client.messages.stream(
+            model=self.model,
+            max_tokens=request.max_tokens,
+            system=self._system(request),
+            messages=self._messages(request)
+        ) as stream:
+            for text in stream.text_stream:
+                if cancelled.is_set():
+                    usage = stream.current_message_snapshot.usage
+                    return Completion(
+                        "".join(parts), usage.input_tokens, chars // 4,  # Estimate; no final usage
+                        usage.cache_creation_input_tokens or 0, usage.cache_read_input_tokens or 0,
+                        ttft=ttft, cancelled=True
+                    )
+                if ttft is None:
+                    ttft = time.monotonic() - start
+                parts.append(text)
+                chars += len(text)
+                if on_text:
+                    on_text(chars)
+
+            message = stream.get_final_message()
+
+        usage = message.usage
+        return Completion(
+            "".join(parts), usage.input_tokens, usage.output_tokens,
+            usage.cache_creation_input_tokens or 0, usage.cache_read_input_tokens or 0, ttft=ttft
+        )
+
+
+class GeminiProvider(Provider):
+    name = "gemini"
+    prices = (0.00125, 0.0, 0.00031, 0.01)  # Gemini 2.5 Pro, prompts up to 200K tokens
+
+    def __init__(self, api_key: str, model: str):
+        super().__init__(model)
+        try:
+            import google.generativeai as genai
+        except ImportError:
+            raise ProviderUnavailable("Gemini needs the optional dependency: pip install 'hacker-dash[gemini]'")
+        genai.configure(api_key=api_key)
+        self.genai = genai
+        self.api_key = api_key
+
+    @property
+    def account(self):
+        return (self.name, self.api_key)
+
+    def stream(self, request: Request, cancelled: threading.Event, on_text=None) -> Completion:
+        start = time.monotonic()
+        ttft = None
+        parts = []
+        chars = 0
+
+        model = self.genai.GenerativeModel(self.model, system_instruction=request.system)
+        contents = request.user if request.context is None else f"{request.context}\n\n{request.user}"
+        response = model.generate_content(
+            contents, stream=True, generation_config={"max_output_tokens": request.max_tokens}
+        )
+        for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:  # Chunk without text parts (e.g. a safety or finish marker)
+                continue
+            if cancelled.is_set():
+                break
+            if ttft is None:
+                ttft = time.monotonic() - start
+            parts.append(text)
+            chars += len(text)
+            if on_text:
+                on_text(chars)
+
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", 0) or 0
+        cached_tokens = getattr(usage, "cached_content_token_count", 0) or 0
+        completion_tokens = getattr(usage, "candidates_token_count", 0) or chars // 4
+        return Completion(
+            "".join(parts), prompt_tokens - cached_tokens, completion_tokens,
+            cache_read_tokens=cached_tokens, ttft=ttft, cancelled=cancelled.is_set()
+        )
+
+
+def from_spec(spec: str, anthropic_client, gemini_api_key: str = None) -> Provider:
+    """Build a provider from "name:model", e.g. "gemini:gemini-2.5-pro"."""
+    name, _, model = spec.partition(":")
+    if not model:
+        raise ValueError(f"Provider spec must look like name:model, got {spec!r}")
+    if name == "anthropic":
+        return AnthropicProvider(anthropic_client, model)
+    if name == "gemini":
+        if not gemini_api_key:
+            raise ProviderUnavailable("Gemini needs GEMINI_API_KEY (or GOOGLE_API_KEY)")
+        return GeminiProvider(gemini_api_key, model)
+    raise ValueError(f"Unknown provider {name!r}")
+
+
+class Attempt:
+    """One provider's run within a hedged call."""
+
+    def __init__(self, provider: Provider, hedge: bool):
+        self.provider = provider
+        self.hedge = hedge
+        self.cancelled = threading.Event()
+        self.started = time.monotonic()
+        self.latency = None
+        self.completion = None
+        self.error = None
+
+
+def hedged(providers: list[Provider], request: Request, hedge_after: float = None,
+           on_done=None, on_text=None) -> Attempt:
+    """Run the request on providers[0]; if it hasn't finished after hedge_after seconds, also start
+    the next provider, and so on. The first to finish wins and the rest are cancelled.
+
+    A provider that fails hands over to the next one immediately. A rate limit (429) also rules out
+    the providers on the same account, which would only add to its load; with nothing else left to
+    try, the 429 goes up to the caller. on_done(attempt) is called from each attempt's thread when
+    it ends, including cancelled losers (so their usage can be logged); on_text(attempt, chars)
+    reports streaming progress.
+    """
+    finished = queue.Queue()
+    attempts = []
+    waiting = list(providers)  # Not yet started
+
+    def run(attempt: Attempt):
+        try:
+            with tracing.span("provider_request", provider=attempt.provider.label, hedge=attempt.hedge):
+                try:
+                    attempt.completion = attempt.provider.stream(
+                        request, attempt.cancelled, on_text and (lambda chars: on_text(attempt, chars))
+                    )
+                except Exception as e:
+                    attempt.error = e
+                attempt.latency = time.monotonic() - attempt.started
+                if on_done:
+                    try:
+                        on_done(attempt)
+                    except Exception:
+                        pass  # Logging (e.g. a locked stats database) must never hold up the result
+        finally:
+            # hedged() waits for every attempt to report; a missing one would block it forever
+            finished.put(attempt)
+
+    def launch():
+        attempt = Attempt(waiting.pop(0), hedge=bool(attempts))
+        attempts.append(attempt)
+        # Copy the context so each attempt's span nests under the caller's
+        threading.Thread(target=contextvars.copy_context().run, args=(run, attempt), daemon=True).start()
+
+    launch()
+    running = 1
+    first_error = None
+    while True:
+        can_hedge = hedge_after is not None and bool(waiting)
+        try:
+            attempt = finished.get(timeout=hedge_after if can_hedge else None)
+        except queue.Empty:
+            launch()
+            running += 1
+            continue
+
+        running -= 1
+        if attempt.error is None and not attempt.completion.cancelled:
+            for other in attempts:
+                if other is not attempt:
+                    other.cancelled.set()
+            return attempt
+
+        first_error = first_error or attempt.error
+        if getattr(attempt.error, "status_code", None) == RATE_LIMITED:
+            waiting[:] = [provider for provider in waiting if provider.account != attempt.provider.account]
+        if waiting:
+            launch()  # Fail over without waiting out the hedge delay
+            running += 1
+        elif running == 0:
+            raise first_error or RuntimeError("Every provider was cancelled")
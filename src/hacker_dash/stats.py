@@ -0,0 +1,332 @@
+import json
+import math
+import os
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+STATS_DB = Path.home() / ".hacker-dash-stats.db"
+LEGACY_STATS_FILE = Path.home() / ".hacker-dash-stats.json"
+# Small aggregates snapshot that running dashboards poll for live updates
+LIVE_FILE = Path.home() / ".hacker-dash-stats.live.json"
+
+# Latency histogram buckets grow by 5%, so percentiles are accurate to within ~5%
+BUCKET_GROWTH = 1.05
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    kind TEXT NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    cache_creation_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_read_tokens INTEGER NOT NULL DEFAULT 0,
+    total_tokens INTEGER NOT NULL,
+    latency REAL NOT NULL,
+    ttft REAL,
+    cost REAL NOT NULL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS calls_timestamp ON calls (timestamp);
+CREATE TABLE IF NOT EXISTS rollups (
+    kind TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0,
+    prompt_tokens INTEGER NOT NULL DEFAULT 0,
+    completion_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_creation_tokens INTEGER NOT NULL DEFAULT 0,
+    cache_read_tokens INTEGER NOT NULL DEFAULT 0,
+    total_tokens INTEGER NOT NULL DEFAULT 0,
+    cost REAL NOT NULL DEFAULT 0,
+    latency_sum REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS latency_histogram (
+    kind TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (kind, bucket)
+);
+CREATE TABLE IF NOT EXISTS provider_latency (
+    provider TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (provider, kind, bucket)
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Columns added after the first release; (table, column, declaration)
+MIGRATIONS = [
+    ("calls", "cache_creation_tokens", "INTEGER NOT NULL DEFAULT 0"),
+    ("calls", "cache_read_tokens", "INTEGER NOT NULL DEFAULT 0"),
+    ("rollups", "cache_creation_tokens", "INTEGER NOT NULL DEFAULT 0"),
+    ("rollups", "cache_read_tokens", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+
+def connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(STATS_DB, timeout=10, isolation_level=None)
+    # WAL lets concurrent generations append while dashboards read
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    _migrate(conn)
+    _import_legacy(conn)
+    return conn
+
+
+def _migrate(conn: sqlite3.Connection):
+    for table, column, declaration in MIGRATIONS:
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing:
+            try:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+            except sqlite3.OperationalError:  # Added concurrently by another process
+                pass
+
+
+def _import_legacy(conn: sqlite3.Connection):
+    """Fold the old JSON stats file into the database once."""
+    if not LEGACY_STATS_FILE.exists():
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if not LEGACY_STATS_FILE.exists():  # Another process imported it first
+            conn.execute("ROLLBACK")
+            return
+
+        data = json.loads(LEGACY_STATS_FILE.read_text())
+        calls = data if isinstance(data, list) else data.get("calls", [])
+        cache = {} if isinstance(data, list) else data.get("cache", {})
+
+        for record in calls:
+            _insert(conn, record)
+        for name in ("hits", "misses"):
+            _bump(conn, f"cache_{name}", cache.get(name, 0))
+        LEGACY_STATS_FILE.rename(LEGACY_STATS_FILE.with_suffix(".json.bak"))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _bucket(latency: float) -> int:
+    return math.ceil(math.log(max(latency, 0.001) * 1000, BUCKET_GROWTH))
+
+
+def _insert(conn: sqlite3.Connection, record: dict):
+    record = dict(record)
+    kind = record.pop("kind", "generate")
+    columns = {
+        name: record.pop(name, None)
+        for name in ("timestamp", "prompt_tokens", "completion_tokens", "total_tokens", "latency", "ttft", "cost")
+    }
+    for name in ("cache_creation_tokens", "cache_read_tokens"):
+        columns[name] = record.pop(name, 0)
+    extra = json.dumps(record) if record else None
+
+    conn.execute(
+        "INSERT INTO calls (timestamp, kind, prompt_tokens, completion_tokens, cache_creation_tokens,"
+        " cache_read_tokens, total_tokens, latency, ttft, cost, extra)"
+        " VALUES (:timestamp, :kind, :prompt_tokens, :completion_tokens, :cache_creation_tokens,"
+        " :cache_read_tokens, :total_tokens, :latency, :ttft, :cost, :extra)",
+        {**columns, "kind": kind, "extra": extra}
+    )
+    conn.execute(
+        "INSERT INTO rollups (kind, count, prompt_tokens, completion_tokens, cache_creation_tokens,"
+        " cache_read_tokens, total_tokens, cost, latency_sum)"
+        " VALUES (:kind, 1, :prompt_tokens, :completion_tokens, :cache_creation_tokens,"
+        " :cache_read_tokens, :total_tokens, :cost, :latency)"
+        " ON CONFLICT (kind) DO UPDATE SET"
+        " count = count + 1,"
+        " prompt_tokens = prompt_tokens + excluded.prompt_tokens,"
+        " completion_tokens = completion_tokens + excluded.completion_tokens,"
+        " cache_creation_tokens = cache_creation_tokens + excluded.cache_creation_tokens,"
+        " cache_read_tokens = cache_read_tokens + excluded.cache_read_tokens,"
+        " total_tokens = total_tokens + excluded.total_tokens,"
+        " cost = cost + excluded.cost,"
+        " latency_sum = latency_sum + excluded.latency_sum",
+        {**columns, "kind": kind}
+    )
+    conn.execute(
+        "INSERT INTO latency_histogram (kind, bucket, count) VALUES (?, ?, 1)"
+        " ON CONFLICT (kind, bucket) DO UPDATE SET count = count + 1",
+        (kind, _bucket(columns["latency"]))
+    )
+    if record.get("provider"):
+        conn.execute(
+            "INSERT INTO provider_latency (provider, kind, bucket, count) VALUES (?, ?, ?, 1)"
+            " ON CONFLICT (provider, kind, bucket) DO UPDATE SET count = count + 1",
+            (record["provider"], kind, _bucket(columns["latency"]))
+        )
+
+
+def _bump(conn: sqlite3.Connection, name: str, amount: int = 1):
+    conn.execute(
+        "INSERT INTO counters (name, value) VALUES (?, ?)"
+        " ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+        (name, amount)
+    )
+
+
+def append_call(record: dict):
+    """Append one inference record and update its rollups in a single transaction."""
+    conn = connect()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        _insert(conn, record)
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+    try:
+        publish_summary()
+    except (OSError, sqlite3.Error):
+        pass  # The record is committed; the live file catches up on the next call
+
+
+def publish_summary():
+    """Atomically rewrite the live aggregates file from the rollups."""
+    # A unique temp file per writer: batch workers, hedge and daemon threads publish concurrently
+    fd, tmp_name = tempfile.mkstemp(dir=LIVE_FILE.parent, prefix=f"{LIVE_FILE.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(json.dumps(summary()))
+        os.replace(tmp_name, LIVE_FILE)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def bump_counter(name: str, amount: int = 1):
+    conn = connect()
+    try:
+        _bump(conn, name, amount)
+    finally:
+        conn.close()
+
+
+def record_cache_lookup(hit: bool):
+    bump_counter("cache_hits" if hit else "cache_misses")
+
+
+def counters(prefix: str = "") -> dict:
+    conn = connect()
+    try:
+        rows = conn.execute(
+            "SELECT name, value FROM counters WHERE substr(name, 1, ?) = ? ORDER BY value DESC",
+            (len(prefix), prefix)
+        )
+        return dict(rows.fetchall())
+    finally:
+        conn.close()
+
+
+def _percentiles(histogram: list[tuple[int, int]], quantiles: tuple) -> list[float]:
+    total = sum(count for _, count in histogram)
+    results = []
+    for q in quantiles:
+        seen = 0
+        value = 0.0
+        for bucket, count in histogram:
+            seen += count
+            value = BUCKET_GROWTH ** bucket / 1000
+            if seen >= q * total:
+                break
+        results.append(value if total else 0.0)
+    return results
+
+
+def summary(kind: str = None) -> dict:
+    """Read the maintained aggregates, optionally for a single kind of call."""
+    conn = connect()
+    try:
+        where, params = ("WHERE kind = ?", (kind,)) if kind else ("", ())
+        row = conn.execute(
+            "SELECT COALESCE(SUM(count), 0), COALESCE(SUM(prompt_tokens), 0), COALESCE(SUM(completion_tokens), 0),"
+            " COALESCE(SUM(cache_creation_tokens), 0), COALESCE(SUM(cache_read_tokens), 0),"
+            f" COALESCE(SUM(total_tokens), 0), COALESCE(SUM(cost), 0), COALESCE(SUM(latency_sum), 0) FROM rollups {where}",
+            params
+        ).fetchone()
+        histogram = conn.execute(
+            f"SELECT bucket, SUM(count) FROM latency_histogram {where} GROUP BY bucket ORDER BY bucket",
+            params
+        ).fetchall()
+        counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+    finally:
+        conn.close()
+
+    count, prompt_tokens, completion_tokens, cache_creation_tokens, cache_read_tokens, total_tokens, cost, latency_sum = row
+    p50, p95, p99 = _percentiles(histogram, (0.5, 0.95, 0.99))
+    return {
+        "calls": count,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cache_creation_tokens": cache_creation_tokens,
+        "cache_read_tokens": cache_read_tokens,
+        "total_tokens": total_tokens,
+        "cost": cost,
+        "avg_latency": latency_sum / count if count else 0.0,
+        "p50_latency": p50,
+        "p95_latency": p95,
+        "p99_latency": p99,
+        "cache_hits": counters.get("cache_hits", 0),
+        "cache_misses": counters.get("cache_misses", 0),
+    }
+
+
+def provider_latency(provider: str, kind: str = None) -> dict:
+    """Call count and latency percentiles for one provider, optionally for a single kind of call."""
+    conn = connect()
+    try:
+        where, params = ("AND kind = ?", (provider, kind)) if kind else ("", (provider,))
+        histogram = conn.execute(
+            f"SELECT bucket, SUM(count) FROM provider_latency WHERE provider = ? {where}"
+            " GROUP BY bucket ORDER BY bucket",
+            params
+        ).fetchall()
+    finally:
+        conn.close()
+
+    p50, p95, p99 = _percentiles(histogram, (0.5, 0.95, 0.99))
+    return {
+        "calls": sum(count for _, count in histogram),
+        "p50_latency": p50,
+        "p95_latency": p95,
+        "p99_latency": p99,
+    }
+
+
+def providers() -> list[str]:
+    conn = connect()
+    try:
+        return [row[0] for row in conn.execute("SELECT DISTINCT provider FROM provider_latency ORDER BY provider")]
+    finally:
+        conn.close()
+
+
+def kinds() -> list[str]:
+    conn = connect()
+    try:
+        return [row[0] for row in conn.execute("SELECT kind FROM rollups ORDER BY kind")]
+    finally:
+        conn.close()
+
+
+def compact(keep_days: int) -> int:
+    """Drop raw records older than keep_days; rollups keep their totals. Returns rows removed."""
+    cutoff = time.time() - keep_days * 24 * 60 * 60
+    conn = connect()
+    try:
+        removed = conn.execute("DELETE FROM calls WHERE timestamp < ?", (cutoff,)).rowcount
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    return removed
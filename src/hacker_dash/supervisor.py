@@ -0,0 +1,127 @@
+import json
+import os
+import socket
+import subprocess
+from pathlib import Path
+
+RUNTIME = Path(__file__).parent / "supervisor_runtime.py"
+QUIT_TIMEOUT = 5  # Seconds to wait for a supervisor to exit before killing it
+
+
+class SupervisorError(RuntimeError):
+    """The supervisor failed to start or died mid-run."""
+
+
+class Supervisor:
+    """A long-lived interpreter in a dashboard environment that runs scripts in-process on this terminal.
+
+    Textual (and psutil) are imported once, while the caller is still validating; each run()
+    then costs only the script's own module code, and a crash comes back as a traceback over
+    the control socket rather than being scraped from terminal output.
+    """
+
+    def __init__(self, python: str):
+        self.python = python
+        ours, theirs = socket.socketpair()
+        try:
+            self.process = subprocess.Popen(
+                [python, str(RUNTIME), str(theirs.fileno())], pass_fds=(theirs.fileno(),)
+            )
+        except OSError:
+            ours.close()
+            raise SupervisorError(f"Could not start {python}")
+        finally:
+            theirs.close()
+        self.channel = ours.makefile("rw", encoding="utf-8")
+        self._socket = ours
+        self.ready = False
+
+    def _send(self, message: dict):
+        self.channel.write(json.dumps(message) + "\n")
+        self.channel.flush()
+
+    def _receive(self) -> dict:
+        try:
+            line = self.channel.readline()
+        except OSError:
+            line = ""
+        if not line:
+            raise SupervisorError(f"Supervisor exited with code {self.process.wait()}")
+        return json.loads(line)
+
+    def run(self, script_path: str) -> subprocess.CompletedProcess:
+        """Run a script to completion, returning a CompletedProcess like launch() does."""
+        if not self.ready:
+            self._receive()  # Only fails if the environment can't import Textual
+            self.ready = True
+        try:
+            self._send({"path": script_path})
+        except OSError:
+            raise SupervisorError("Supervisor is gone")
+        message = self._receive()
+        return subprocess.CompletedProcess(
+            [self.python, script_path], message["returncode"], stderr=message["error"]
+        )
+
+    def close(self):
+        try:
+            self._send({"quit": True})
+            self.process.wait(timeout=QUIT_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        finally:
+            self.channel.close()
+            self._socket.close()
+
+
+class SupervisedLauncher:
+    """A launcher for executor.run_dashboard that reuses one Supervisor across heal attempts.
+
+    A new supervisor is only started when a fix changes the environment (its dependencies).
+    Commands it can't supervise (`uv run` without a pooled env, non-POSIX) and supervisors that
+    die go through executor.launch() instead, which starts a fresh process as before.
+    """
+
+    def __init__(self):
+        self.supervisor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def prepare(self, cmd: list[str]) -> bool:
+        """Start (or keep) the supervisor for cmd now, so its imports overlap with whatever comes before launch.
+
+        Returns True if cmd will run in the supervisor.
+        """
+        if os.name != "posix" or len(cmd) != 2 or cmd[0] == "uv":
+            return False
+        if self.supervisor is not None and self.supervisor.python != cmd[0]:
+            self.close()
+        if self.supervisor is None:
+            try:
+                self.supervisor = Supervisor(cmd[0])
+            except SupervisorError:
+                return False
+        return True
+
+    def __call__(self, cmd: list[str]) -> subprocess.CompletedProcess:
+        from .executor import launch
+
+        self.prepare(cmd)
+        if self.supervisor is None:
+            return launch(cmd)
+        try:
+            return self.supervisor.run(cmd[1])
+        except SupervisorError:
+            # Launching normally reproduces whatever killed it and captures the output
+            self.close()
+            return launch(cmd)
+
+    def close(self):
+        if self.supervisor is not None:
+            self.supervisor.close()
+            self.supervisor = None
@@ -0,0 +1,133 @@
+"""hacker-dash supervisor: runs dashboard scripts one after another in this warm interpreter.
+
+Started by hacker_dash.supervisor inside the dashboard's environment, on the user's terminal.
+It can't import hacker_dash itself. argv[1] is a control socket carrying one JSON object per line:
+
+    parent -> {"path": script}       run the script (as __main__) and report how it ended
+    parent -> {"quit": true}         exit
+    self   -> {"ready": true}        Textual is imported
+    self   -> {"returncode": int, "error": str}
+"""
+import io
+import json
+import os
+import socket
+import sys
+import traceback
+import types
+
+# Run by path, so sys.path[0] is hacker_dash's package directory; its modules mustn't shadow anything
+sys.path.pop(0)
+
+import textual.app  # noqa: E402
+
+try:
+    import psutil  # noqa: F401  Nearly every dashboard polls it; import it while nobody is waiting
+except ImportError:
+    pass
+
+# Between attempts, hold the alternate screen so the terminal doesn't flip back to the shell
+HOLD_SCREEN = "\x1b[?1049h\x1b[2J\x1b[H"
+RELEASE_SCREEN = "\x1b[?25h\x1b[?1049l"
+
+apps = []
+error_texts = []
+
+
+def _record_run(run):
+    def wrapper(self, *args, **kwargs):
+        apps.append(self)
+        return run(self, *args, **kwargs)
+    return wrapper
+
+
+def _record_errors(print_errors):
+    # Errors that aren't exceptions (e.g. stylesheet errors) only exist as renderables printed at exit
+    def wrapper(self):
+        from rich.console import Console
+
+        for renderable in getattr(self, "_exit_renderables", [])[:1]:
+            console = Console(file=io.StringIO(), width=100, color_system=None)
+            console.print(renderable)
+            error_texts.append(console.file.getvalue())
+        return print_errors(self)
+    return wrapper
+
+
+textual.app.App.run = _record_run(textual.app.App.run)
+if hasattr(textual.app.App, "_print_error_renderables"):
+    textual.app.App._print_error_renderables = _record_errors(textual.app.App._print_error_renderables)
+
+
+def _stop_sampler(module: types.ModuleType):
+    # The injected metrics runtime's thread would otherwise keep polling psutil through every later run
+    sampler = module.__dict__.get("metrics")
+    if type(sampler).__name__ == "_MetricsSampler":
+        sampler.stop()
+
+
+def run_script(path: str) -> tuple[int, str]:
+    apps.clear()
+    error_texts.clear()
+    with open(path) as f:
+        source = f.read()
+    sys.argv = [path]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(path)))  # As `python script.py` would
+    # A fresh __main__ per attempt (Textual finds CSS_PATH and error locations through it);
+    # modules the scripts import stay loaded, which is the point
+    module = types.ModuleType("__main__")
+    module.__file__ = path
+    runtime, sys.modules["__main__"] = sys.modules["__main__"], module
+    try:
+        exec(compile(source, path, "exec"), module.__dict__)
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0, ""
+        return 1, str(e.code)
+    except Exception:
+        return 1, traceback.format_exc()
+    finally:
+        sys.path.pop(0)
+        sys.modules["__main__"] = runtime
+        _stop_sampler(module)
+
+    for app in apps:
+        # Textual catches handler exceptions, shows them and exits; the app keeps the first one
+        error = getattr(app, "_exception", None)
+        # Textual's own errors (e.g. a stylesheet's) say what's wrong in what it printed, not in the exception
+        if error is not None and not (error_texts and type(error).__module__.startswith("textual.")):
+            return 1, "".join(traceback.format_exception(error))
+        if app.return_code:
+            return app.return_code, "".join(error_texts) or f"App exited with code {app.return_code}"
+    return 0, ""
+
+
+def main():
+    control = socket.socket(fileno=int(sys.argv[1]))
+    channel = control.makefile("rw", encoding="utf-8")
+
+    def send(message: dict):
+        channel.write(json.dumps(message) + "\n")
+        channel.flush()
+
+    send({"ready": True})
+    held = False
+    for line in channel:
+        message = json.loads(line)
+        if message.get("quit"):
+            break
+        returncode, error = run_script(message["path"])
+        # A crash is usually followed by a heal and another run; a clean exit ends the session
+        held = bool(returncode)
+        if held:
+            sys.stdout.write(HOLD_SCREEN)
+            sys.stdout.flush()
+        send({"returncode": returncode, "error": error})
+
+    if held:
+        sys.stdout.write(RELEASE_SCREEN)
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import asyncio
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from platformdirs import user_log_dir
+
+TRACE_DIR = Path(user_log_dir("hacker-dash")) / "traces"
+
+_enabled = False
+_events = []
+_lock = threading.Lock()
+# Context-local so concurrent asyncio tasks and threads each see their own open spans
+_open_spans = contextvars.ContextVar("open_spans", default=())
+
+
+class Span:
+    def __init__(self, name: str, attributes: dict):
+        self.name = name
+        self.attributes = attributes
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def _track_id() -> int:
+    # Concurrent asyncio tasks get their own row so their spans don't interleave
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return id(task) if task else threading.get_ident()
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes):
+    """Time a block as a Chrome trace 'complete' event; a no-op unless tracing is enabled."""
+    current = Span(name, attributes)
+    if not _enabled:
+        yield current
+        return
+
+    token = _open_spans.set(_open_spans.get() + (current,))
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.set(error=repr(e))
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        _open_spans.reset(token)
+        with _lock:
+            _events.append({
+                "name": name,
+                "cat": "hacker-dash",
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": duration * 1e6,
+                "pid": os.getpid(),
+                "tid": _track_id(),
+                "args": current.attributes,
+            })
+
+
+def annotate(**attributes):
+    """Attach attributes (e.g. token usage) to the innermost open span."""
+    spans = _open_spans.get()
+    if _enabled and spans:
+        spans[-1].set(**attributes)
+
+
+def flush(path: Path = None) -> Path | None:
+    """Write collected spans in Chrome trace event format (chrome://tracing, Perfetto)."""
+    if not _enabled or not _events:
+        return None
+
+    if path is None:
+        TRACE_DIR.mkdir(parents=True, exist_ok=True)
+        path = TRACE_DIR / f"trace-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.json"
+    with _lock:
+        events = sorted(_events, key=lambda event: event["ts"])
+    path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, default=str))
+    return path
@@ -0,0 +1,186 @@
+import ast
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+# PEP 723 reference regex for inline script metadata blocks
+METADATA_BLOCK = re.compile(
+    r'(?m)^# /// (?P<type>[a-zA-Z0-9-]+)$\s(?P<content>(^#(| .*)$\s)+)^# ///$'
+)
+
+# Distributions whose import name differs from the normalized project name
+IMPORT_NAMES = {
+    "beautifulsoup4": "bs4",
+    "pillow": "PIL",
+    "python_dateutil": "dateutil",
+    "pyyaml": "yaml",
+    "scikit_learn": "sklearn",
+    "opencv_python": "cv2",
+    "python_dotenv": "dotenv",
+}
+
+# Packages a dependency always installs, so scripts can import them without declaring them
+# (e.g. `from rich.text import Text` next to textual)
+BUNDLED_IMPORTS = {
+    "textual": {"rich", "markdown_it", "mdit_py_plugins", "mdurl", "platformdirs", "pygments", "typing_extensions"},
+    "rich": {"markdown_it", "mdurl", "pygments"},
+}
+
+SMOKE_TIMEOUT = 60
+SMOKE_TICKS = 15
+
+# Imports the script without running its __main__ block, then mounts the App headlessly
+SMOKE_HARNESS = '''
+import asyncio
+import runpy
+import sys
+from textual.app import App
+
+namespace = runpy.run_path(sys.argv[1], run_name="__smoke__")
+apps = [v for v in namespace.values() if isinstance(v, type) and issubclass(v, App) and v is not App]
+if not apps:
+    sys.exit("No textual App subclass found in script")
+
+async def main():
+    app = apps[-1]()
+    async with app.run_test(headless=True) as pilot:
+        for _ in range({ticks}):
+            await pilot.pause(0.1)
+
+asyncio.run(main())
+'''
+
+
+def script_header(code: str) -> str | None:
+    """Return the raw PEP 723 `script` block, if present."""
+    for match in METADATA_BLOCK.finditer(code):
+        if match.group("type") == "script":
+            return match.group(0)
+    return None
+
+
+def script_dependencies(code: str) -> list[str]:
+    """Parse the dependency list out of the PEP 723 header."""
+    header = script_header(code)
+    if header is None:
+        raise ValueError("Missing PEP 723 '# /// script' header")
+
+    content = "".join(
+        line[2:] if line.startswith("# ") else line[1:]
+        for line in header.splitlines(keepends=True)[1:-1]
+    )
+    try:
+        import tomllib
+    except ImportError:  # Python 3.10
+        match = re.search(r'(?ms)^dependencies\s*=\s*(\[.*?\])', content)
+        return ast.literal_eval(match.group(1)) if match else []
+
+    try:
+        metadata = tomllib.loads(content)
+    except tomllib.TOMLDecodeError as e:
+        raise ValueError(f"Invalid TOML in PEP 723 header: {e}")
+    return metadata.get("dependencies", [])
+
+
+def import_name(requirement: str) -> str | None:
+    """The import name for a requirement string, or None if it doesn't start with a project name."""
+    match = re.match(r'[A-Za-z0-9][A-Za-z0-9._-]*', requirement.strip()) if isinstance(requirement, str) else None
+    if match is None:
+        return None
+    name = re.sub(r'[-_.]+', '_', match.group(0)).lower()
+    return IMPORT_NAMES.get(name, name)
+
+
+def check_syntax(code: str) -> str | None:
+    try:
+        compile(code, "<dashboard>", "exec")
+    except SyntaxError as e:
+        return f"SyntaxError: {e.msg} (line {e.lineno})\n{(e.text or '').rstrip()}"
+    return None
+
+
+def check_header(code: str) -> str | None:
+    try:
+        script_dependencies(code)
+    except (ValueError, SyntaxError) as e:
+        return str(e)
+    return None
+
+
+# Handlers that make an import optional, e.g. `try: import GPUtil / except ImportError: GPUtil = None`
+OPTIONAL_IMPORT_HANDLERS = {"ImportError", "ModuleNotFoundError", "Exception", "BaseException"}
+
+
+def _handles_import_error(node: ast.Try) -> bool:
+    for handler in node.handlers:
+        if handler.type is None:
+            return True
+        types = handler.type.elts if isinstance(handler.type, ast.Tuple) else [handler.type]
+        if any(isinstance(t, ast.Name) and t.id in OPTIONAL_IMPORT_HANDLERS for t in types):
+            return True
+    return False
+
+
+def _top_level_imports(body: list[ast.stmt]):
+    """Yield (module, line) for imports that always run when the script is loaded."""
+    for node in body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name, node.lineno
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            yield node.module, node.lineno
+        elif isinstance(node, ast.Try) and not _handles_import_error(node):
+            yield from _top_level_imports(node.body)
+
+
+def check_imports(code: str) -> str | None:
+    """Every unconditional top-level package must be stdlib, declared in the header, or installed by a declared one."""
+    declared = set()
+    for dep in script_dependencies(code):
+        name = import_name(dep)
+        if name is None:
+            return f"Invalid dependency {dep!r} in the PEP 723 header"
+        declared.add(name)
+    available = declared.union(*(BUNDLED_IMPORTS.get(name, ()) for name in declared))
+
+    for module, lineno in _top_level_imports(ast.parse(code).body):
+        top = module.split(".")[0]
+        if top not in sys.stdlib_module_names and top not in available:
+            return (
+                f"ModuleNotFoundError: '{top}' is imported on line {lineno} "
+                f"but not listed in the PEP 723 dependencies {sorted(declared)}"
+            )
+    return None
+
+
+def smoke_test(code: str, script_path: Path) -> str | None:
+    """Mount the App headlessly for a few ticks in the script's own environment."""
+    from . import envpool
+
+    try:
+        result = envpool.run_harness(
+            code, SMOKE_HARNESS.format(ticks=SMOKE_TICKS), [str(script_path)], timeout=SMOKE_TIMEOUT
+        )
+    except subprocess.TimeoutExpired:
+        # Inconclusive (usually a slow environment resolve); let the real launch decide
+        return None
+
+    if result.returncode != 0:
+        return result.stderr.strip() or f"Smoke test exited with code {result.returncode}"
+    return None
+
+
+def validate(code: str, script_path: Path = None) -> str | None:
+    """Run the pre-flight stages in order and return the first error, or None.
+
+    The smoke test only runs when the code has been written to `script_path`.
+    """
+    for check in (check_syntax, check_header, check_imports):
+        error = check(code)
+        if error:
+            return error
+
+    if script_path is not None:
+        return smoke_test(code, script_path)
+    return None
@@ -0,0 +1,212 @@
+import json
+import threading
+import time
+
+import pytest
+
+from hacker_dash import batch
+
+VALID = '''# /// script
+# dependencies = ["textual"]
+# ///
+from textual.app import App
+
+
+class Dashboard(App):
+    pass
+
+
+if __name__ == "__main__":
+    Dashboard().run()
+'''
+
+
+class FakeResponse:
+    def __init__(self, headers: dict):
+        self.headers = headers
+
+
+class FakeAPIError(Exception):
+    """Shaped like the SDK's APIStatusError: a status_code and a response with headers."""
+
+    def __init__(self, status_code: int, retry_after: str = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = FakeResponse({"retry-after": retry_after} if retry_after else {})
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(batch.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(batch.time, "sleep", clock.sleep)
+    return clock
+
+
+def flaky(*errors, result=VALID):
+    """A generate() that raises each error in turn, then returns result."""
+    calls = []
+
+    def generate(prompt):
+        calls.append(prompt)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    generate.calls = calls
+    return generate
+
+
+def test_bucket_allows_a_burst_up_to_capacity(clock):
+    bucket = batch.TokenBucket(rate=2, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == []
+
+
+def test_bucket_waits_for_the_next_token(clock):
+    bucket = batch.TokenBucket(rate=2, capacity=1)
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_bucket_refills_over_time_without_exceeding_capacity(clock):
+    bucket = batch.TokenBucket(rate=1, capacity=2)
+    bucket.acquire()
+    bucket.acquire()
+    clock.now += 10
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.sleeps == []
+    assert bucket.tokens == pytest.approx(0)
+
+
+def test_bucket_capacity_defaults_to_at_least_one():
+    assert batch.TokenBucket(rate=0.5).capacity == 1.0
+    assert batch.TokenBucket(rate=4).capacity == 4
+
+
+def test_retries_rate_limits_and_overloads(clock):
+    generate = flaky(FakeAPIError(429), FakeAPIError(529))
+    code, retries = batch.generate_with_retries(generate, "cpu", batch.TokenBucket(rate=100), max_retries=5)
+    assert (code, retries) == (VALID, 2)
+    assert generate.calls == ["cpu"] * 3
+
+
+def test_honours_retry_after(clock):
+    generate = flaky(FakeAPIError(429, retry_after="7"))
+    batch.generate_with_retries(generate, "cpu", batch.TokenBucket(rate=100), max_retries=1)
+    assert clock.sleeps == [7.0]
+
+
+def test_retry_after_is_capped(clock):
+    generate = flaky(FakeAPIError(529, retry_after="3600"))
+    batch.generate_with_retries(generate, "cpu", batch.TokenBucket(rate=100), max_retries=1)
+    assert clock.sleeps == [batch.MAX_BACKOFF]
+
+
+def test_backs_off_exponentially_without_retry_after(clock, monkeypatch):
+    monkeypatch.setattr(batch.random, "uniform", lambda low, high: high)
+    generate = flaky(FakeAPIError(429), FakeAPIError(429, retry_after="soon"), FakeAPIError(429))
+    batch.generate_with_retries(generate, "cpu", batch.TokenBucket(rate=100), max_retries=3)
+    assert clock.sleeps == [1, 2, 4]
+
+
+def test_gives_up_after_max_retries(clock):
+    generate = flaky(*[FakeAPIError(529)] * 3)
+    with pytest.raises(FakeAPIError):
+        batch.generate_with_retries(generate, "cpu", batch.TokenBucket(rate=100), max_retries=2)
+    assert len(generate.calls) == 3
+
+
+def test_other_errors_are_not_retried(clock):
+    generate = flaky(FakeAPIError(400), ValueError("bad"))
+    with pytest.raises(FakeAPIError):
+        batch.generate_with_retries(generate, "cpu", batch.TokenBucket(rate=100), max_retries=5)
+    assert len(generate.calls) == 1
+
+
+def write_prompts(path, prompts):
+    path.write_text("".join(json.dumps(prompt) + "\n" for prompt in prompts))
+    return path
+
+
+def test_batch_writes_scripts_and_manifest(tmp_path):
+    prompts = write_prompts(tmp_path / "prompts.jsonl", [{"id": "cpu", "prompt": "cpu"}, "memory"])
+    out = tmp_path / "out"
+    outputs = {"cpu": VALID, "memory": "def broken(:\n"}
+
+    results = batch.run_batch(prompts, out, outputs.get, rate=100)
+
+    statuses = {entry["id"]: entry["status"] for entry in results}
+    assert statuses == {"cpu": "ok", "0002": "invalid"}
+    assert (out / "cpu.py").exists()
+    assert not (out / "0002.py").exists()
+    assert batch.load_manifest(out).keys() == {"cpu", "0002"}
+
+
+def test_resume_skips_finished_prompts_and_retries_errors(tmp_path):
+    prompts = write_prompts(tmp_path / "prompts.jsonl", [{"id": "a", "prompt": "a"}, {"id": "b", "prompt": "b"},
+                                                         {"id": "c", "prompt": "c"}])
+    out = tmp_path / "out"
+
+    def first_run(prompt):
+        if prompt == "b":
+            raise RuntimeError("connection reset")
+        if prompt == "c":
+            return "not python ("
+        return VALID
+
+    batch.run_batch(prompts, out, first_run, rate=100)
+    assert {id_: entry["status"] for id_, entry in batch.load_manifest(out).items()} == \
+        {"a": "ok", "b": "error", "c": "invalid"}
+
+    seen = []
+
+    def second_run(prompt):
+        seen.append(prompt)
+        return VALID
+
+    results = batch.run_batch(prompts, out, second_run, rate=100)
+
+    assert seen == ["b"]
+    assert [(entry["id"], entry["status"]) for entry in results] == [("b", "ok")]
+    # The manifest is append-only; the latest entry for an id wins
+    assert batch.load_manifest(out)["b"]["status"] == "ok"
+    assert (out / "b.py").exists()
+
+
+def test_batch_keeps_at_most_concurrency_requests_in_flight(tmp_path):
+    prompts = write_prompts(tmp_path / "prompts.jsonl", [f"prompt {i}" for i in range(12)])
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+
+    def generate(prompt):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight -= 1
+        return VALID
+
+    results = batch.run_batch(prompts, tmp_path / "out", generate, concurrency=3, rate=1000)
+
+    assert len(results) == 12
+    assert peak == 3
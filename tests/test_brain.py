@@ -0,0 +1,40 @@
+import pytest
+
+from hacker_dash import brain, config
+
+
+@pytest.fixture
+def hedge(monkeypatch):
+    def configure(specs, gemini_key=None):
+        monkeypatch.setattr(config, "get_hedge_providers", lambda: specs)
+        monkeypatch.setattr(config, "get_gemini_api_key", lambda: gemini_key)
+        brain.get_providers.cache_clear()
+
+    yield configure
+    brain.get_providers.cache_clear()
+
+
+@pytest.mark.parametrize("specs, reason", [
+    ("gemini", "must look like name:model"),
+    ("bogus:model", "Unknown provider"),
+    ("gemini:gemini-2.5-pro", "Gemini needs GEMINI_API_KEY"),
+])
+def test_bad_hedge_config_warns_once_and_keeps_the_primary(hedge, capsys, specs, reason):
+    hedge(specs)
+    assert [provider.label for provider in brain.get_providers("key")] == [f"anthropic:{brain.MODEL}"]
+    brain.get_providers("key")
+    warnings = capsys.readouterr().err.splitlines()
+    assert len(warnings) == 1
+    assert reason in warnings[0]
+
+
+def test_valid_specs_are_kept_around_a_bad_one(hedge, capsys):
+    hedge("bogus:model, anthropic:claude-sonnet-4-20250514")
+    labels = [provider.label for provider in brain.get_providers("key")]
+    assert labels == [f"anthropic:{brain.MODEL}", "anthropic:claude-sonnet-4-20250514"]
+    assert "bogus" in capsys.readouterr().err
+
+
+def test_hedging_can_be_turned_off(hedge):
+    hedge("none")
+    assert len(brain.get_providers("key")) == 1
@@ -0,0 +1,25 @@
+import pytest
+
+from hacker_dash import condense
+
+
+def test_short_text_is_unchanged():
+    assert condense._fit("x" * 40, 10) == "x" * 40
+
+
+@pytest.mark.parametrize("budget", [0, 1, 3, 5, 6, 7, 10, 50])
+def test_never_exceeds_the_budget(budget):
+    text = "".join(str(i % 10) for i in range(500))
+    assert len(condense._fit(text, budget)) <= budget * 4
+
+
+def test_keeps_both_ends():
+    text = "head" + "." * 1000 + "ValueError: boom"
+    fitted = condense._fit(text, 25)
+    assert fitted.startswith("head")
+    assert fitted.endswith("ValueError: boom")
+    assert "[... truncated ...]" in fitted
+
+
+def test_tiny_budget_keeps_the_tail():
+    assert condense._fit("x" * 500 + "end", 1) == "xend"
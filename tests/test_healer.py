@@ -0,0 +1,39 @@
+import pytest
+
+from hacker_dash import healer, injector
+
+HEADER = '# /// script\n# dependencies = ["textual", "psutil"]\n# ///\n'
+
+# Follows the system prompt: reads the shared sampler, so injection adds the metrics runtime
+USES_METRICS = HEADER + '''from textual.app import App
+
+
+class Dashboard(App):
+    def compose(self):
+        yield {widget}(str(metrics.snapshot()["cpu_percent"]))
+
+
+if __name__ == "__main__":
+    Dashboard().run()
+'''
+
+
+@pytest.mark.parametrize("error, name, statement", [
+    ("NameError: name 'Label' is not defined", "Label", "from textual.widgets import Label"),
+    ("NameError: name 'ComposeResult' is not defined", "Label", "from textual.app import ComposeResult"),
+    ("ImportError: cannot import name 'Label' from 'textual.app'", "Label", "from textual.widgets import Label"),
+])
+def test_import_fix_survives_reinjection(error, name, statement):
+    code, _ = injector.inject_stats_panel(USES_METRICS.format(widget=name))
+    assert "class _MetricsSampler" in code
+
+    fixed, rule = healer.heal(code, error)
+    assert statement in fixed
+
+    # The next attempt injects again, and the library stores the code with injection removed
+    reinjected, injected = injector.inject_stats_panel(fixed)
+    assert injected
+    assert statement in reinjected
+    assert reinjected.count("class _MetricsSampler") == 1
+    assert statement in injector.remove_stats_panel(fixed)
+    assert statement in injector.remove_stats_panel(reinjected)
@@ -0,0 +1,156 @@
+import ast
+
+import pytest
+
+from hacker_dash import injector
+
+HEADER = '# /// script\n# dependencies = ["textual", "psutil"]\n# ///\n'
+
+# The shapes from benchmarks/bench_injector.py that broke the old regex injector
+CORPUS = {
+    "single_line_imports": HEADER + '''from textual.app import App
+from textual.widgets import Header, Footer
+
+class Dashboard(App):
+    def compose(self):
+        yield Header()
+        yield Footer()
+
+if __name__ == "__main__":
+    Dashboard().run()
+''',
+    "parenthesized_imports": HEADER + '''from textual.app import App, ComposeResult
+from textual.widgets import (
+    Header,
+    Footer,
+    Label,
+)
+
+class Dashboard(App):
+    def compose(self) -> ComposeResult:
+        yield Header()
+        yield Label("hi")
+''',
+    "compose_result_no_header": HEADER + '''from textual.app import App, ComposeResult
+from textual.containers import Vertical
+from textual.widgets import Label
+
+class Dashboard(App):
+    def compose(self) -> ComposeResult:
+        """Build the layout."""
+        with Vertical():
+            yield Label("cpu")
+''',
+    "multiple_app_subclasses": HEADER + '''from textual.app import App
+from textual.widgets import Static, Footer
+
+class BaseDash(App):
+    def compose(self):
+        yield Footer()
+
+class NeonDash(BaseDash):
+    def compose(self):
+        yield Static("neon")
+        yield Footer()
+
+if __name__ == "__main__":
+    NeonDash().run()
+''',
+    "no_widget_imports": HEADER + '''import textual.app
+
+class Dashboard(textual.app.App):
+    pass
+''',
+    "subscripted_app_base": HEADER + '''from textual.app import App, ComposeResult
+from textual.widgets import Header, Label
+
+class Dashboard(App[None]):
+    def compose(self) -> ComposeResult:
+        yield Header()
+        yield Label("cpu")
+
+if __name__ == "__main__":
+    Dashboard().run()
+''',
+}
+
+ONE_LINE_COMPOSE = HEADER + '''from textual.app import App
+from textual.widgets import Label
+
+class Dashboard(App):
+    def compose(self): yield Label("cpu")
+'''
+
+
+def assert_injected_once(code: str):
+    ast.parse(code)
+    assert code.count("class StatsPanel(") == 1
+    assert code.count("yield StatsPanel()") == 1
+
+
+def compose_of(code: str, class_name: str) -> ast.FunctionDef:
+    app = next(node for node in ast.parse(code).body if isinstance(node, ast.ClassDef) and node.name == class_name)
+    return next(node for node in app.body if isinstance(node, ast.FunctionDef) and node.name == "compose")
+
+
+@pytest.mark.parametrize("code", CORPUS.values(), ids=CORPUS.keys())
+def test_injects_the_panel_once(code):
+    injected_code, injected = injector.inject_stats_panel(code)
+    assert injected
+    assert_injected_once(injected_code)
+
+
+@pytest.mark.parametrize("code", CORPUS.values(), ids=CORPUS.keys())
+def test_injecting_twice_is_stable(code):
+    once, _ = injector.inject_stats_panel(code)
+    twice, injected = injector.inject_stats_panel(once)
+    assert injected
+    assert twice == once
+
+
+@pytest.mark.parametrize("code", CORPUS.values(), ids=CORPUS.keys())
+def test_remove_undoes_injection(code):
+    assert injector.remove_stats_panel(injector.inject_stats_panel(code)[0]) == code
+
+
+def test_one_line_compose_is_left_alone():
+    assert injector.inject_stats_panel(ONE_LINE_COMPOSE) == (ONE_LINE_COMPOSE, False)
+
+
+def test_unparseable_code_is_left_alone():
+    code = HEADER + "class Dashboard(App:\n"
+    assert injector.inject_stats_panel(code) == (code, False)
+
+
+def test_panel_goes_before_the_header():
+    code, _ = injector.inject_stats_panel(CORPUS["single_line_imports"])
+    yields = [stmt.value.value.func.id for stmt in compose_of(code, "Dashboard").body]
+    assert yields == ["StatsPanel", "Header", "Footer"]
+
+
+def test_panel_goes_after_a_docstring():
+    code, _ = injector.inject_stats_panel(CORPUS["compose_result_no_header"])
+    body = compose_of(code, "Dashboard").body
+    assert isinstance(body[0].value, ast.Constant)
+    assert injector._is_yield_of(body[1], "StatsPanel")
+
+
+def test_panel_goes_in_the_app_that_runs():
+    code, _ = injector.inject_stats_panel(CORPUS["multiple_app_subclasses"])
+    assert injector._yields_stats_panel(compose_of(code, "NeonDash"))
+    assert not injector._yields_stats_panel(compose_of(code, "BaseDash"))
+
+
+def test_adds_compose_when_the_app_has_none():
+    code, _ = injector.inject_stats_panel(CORPUS["no_widget_imports"])
+    assert "from textual.widgets import Static\n" in code
+    assert injector._yields_stats_panel(compose_of(code, "Dashboard"))
+
+
+def test_metrics_runtime_only_added_when_used():
+    assert injector.inject_metrics_runtime(CORPUS["single_line_imports"]) == CORPUS["single_line_imports"]
+
+    uses_metrics = CORPUS["single_line_imports"].replace("yield Header()", 'yield Header(metrics.snapshot()["cpu_percent"])')
+    code = injector.inject_metrics_runtime(uses_metrics)
+    assert code.count("class _MetricsSampler") == 1
+    assert injector.inject_metrics_runtime(code) == code
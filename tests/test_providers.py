@@ -0,0 +1,157 @@
+import threading
+import time
+
+import pytest
+
+from hacker_dash import providers
+
+REQUEST = providers.Request(system="system", user="user", max_tokens=100)
+
+
+class StubProvider(providers.Provider):
+    """Answers after `delay` seconds (or raises `error`), stopping early if cancelled."""
+
+    name = "stub"
+
+    def __init__(self, model: str, delay: float = 0.0, error: Exception = None, account: str = None):
+        super().__init__(model)
+        self.delay = delay
+        self.error = error
+        self.started = threading.Event()
+        self._account = account
+
+    @property
+    def account(self):
+        return self._account or self
+
+    def stream(self, request, cancelled, on_text=None):
+        self.started.set()
+        if self.error is not None:
+            raise self.error
+        if cancelled.wait(self.delay):
+            return providers.Completion("", cancelled=True)
+        if on_text:
+            on_text(len(self.model))
+        return providers.Completion(self.model)
+
+
+def run(stubs, **kwargs) -> providers.Attempt:
+    return providers.hedged(stubs, REQUEST, **kwargs)
+
+
+def test_fast_primary_never_hedges():
+    primary, backup = StubProvider("primary"), StubProvider("backup")
+    attempt = run([primary, backup], hedge_after=1.0)
+    assert attempt.provider is primary
+    assert not attempt.hedge
+    assert not backup.started.is_set()
+
+
+def test_hedge_starts_after_hedge_after_and_wins():
+    primary, backup = StubProvider("primary", delay=5), StubProvider("backup")
+    start = time.monotonic()
+    attempt = run([primary, backup], hedge_after=0.05)
+    assert attempt.provider is backup
+    assert attempt.hedge
+    assert attempt.completion.text == "backup"
+    assert 0.05 <= time.monotonic() - start < 1
+
+
+def test_without_hedge_after_only_the_primary_runs():
+    primary, backup = StubProvider("primary", delay=0.1), StubProvider("backup")
+    attempt = run([primary, backup])
+    assert attempt.provider is primary
+    assert not backup.started.is_set()
+
+
+def test_error_fails_over_without_waiting_for_the_hedge_delay():
+    primary = StubProvider("primary", error=RuntimeError("down"))
+    backup = StubProvider("backup")
+    start = time.monotonic()
+    attempt = run([primary, backup], hedge_after=5)
+    assert attempt.provider is backup
+    assert time.monotonic() - start < 1
+
+
+def test_raises_the_first_error_when_every_provider_fails():
+    first = RuntimeError("first")
+    stubs = [StubProvider("a", error=first), StubProvider("b", error=RuntimeError("second"))]
+    with pytest.raises(RuntimeError) as info:
+        run(stubs, hedge_after=5)
+    assert info.value is first
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def test_rate_limit_is_not_retried_on_the_same_account():
+    error = RateLimited()
+    primary = StubProvider("primary", error=error, account="key")
+    backup = StubProvider("backup", account="key")
+    with pytest.raises(RateLimited) as info:
+        run([primary, backup], hedge_after=5)
+    assert info.value is error
+    assert not backup.started.is_set()
+
+
+def test_rate_limit_fails_over_to_another_account():
+    stubs = [StubProvider("primary", error=RateLimited(), account="key"),
+             StubProvider("same key", account="key"), StubProvider("other", account="other key")]
+    attempt = run(stubs, hedge_after=5)
+    assert attempt.provider.model == "other"
+    assert not stubs[1].started.is_set()
+
+
+def test_other_errors_still_fail_over_on_the_same_account():
+    stubs = [StubProvider("primary", error=RuntimeError("down"), account="key"), StubProvider("backup", account="key")]
+    assert run(stubs, hedge_after=5).provider.model == "backup"
+
+
+def test_losers_are_cancelled_and_reported():
+    done = []
+    all_done = threading.Event()
+
+    def on_done(attempt):
+        done.append(attempt)
+        if len(done) == 2:
+            all_done.set()
+
+    primary, backup = StubProvider("primary", delay=5), StubProvider("backup")
+    winner = run([primary, backup], hedge_after=0.05, on_done=on_done)
+
+    assert all_done.wait(1), "the cancelled primary never reported"
+    loser = next(attempt for attempt in done if attempt is not winner)
+    assert loser.provider is primary
+    assert loser.cancelled.is_set()
+    assert loser.completion.cancelled
+    assert not winner.cancelled.is_set()
+
+
+def test_on_text_reports_the_attempt():
+    progress = []
+    run([StubProvider("primary")], on_text=lambda attempt, chars: progress.append((attempt.provider.model, chars)))
+    assert progress == [("primary", len("primary"))]
+
+
+def run_or_fail(stubs, **kwargs) -> providers.Attempt:
+    """run(), failing the test instead of hanging it if hedged() never returns."""
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(attempt=run(stubs, **kwargs)), daemon=True)
+    thread.start()
+    thread.join(2)
+    assert not thread.is_alive(), "hedged() hung"
+    return result["attempt"]
+
+
+def locked_stats(attempt):
+    raise OSError("stats database is locked")
+
+
+def test_raising_on_done_does_not_hang_or_lose_the_result():
+    assert run_or_fail([StubProvider("primary")], on_done=locked_stats).completion.text == "primary"
+
+
+def test_raising_on_done_still_fails_over():
+    stubs = [StubProvider("primary", error=RuntimeError("down")), StubProvider("backup")]
+    assert run_or_fail(stubs, hedge_after=5, on_done=locked_stats).provider.model == "backup"
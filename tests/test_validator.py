@@ -0,0 +1,50 @@
+import pytest
+
+from hacker_dash import validator
+
+
+def script(body: str, dependencies: str = '"textual", "psutil"') -> str:
+    return f"# /// script\n# dependencies = [{dependencies}]\n# ///\n{body}"
+
+
+@pytest.mark.parametrize("body", [
+    "from rich.text import Text\n",
+    "from rich.table import Table\nimport pygments\n",
+    "from markdown_it import MarkdownIt\n",
+])
+def test_packages_textual_installs_need_no_declaration(body):
+    assert validator.validate(script("from textual.app import App\n" + body)) is None
+
+
+def test_bundled_packages_still_need_their_parent():
+    error = validator.validate(script("from rich.text import Text\n", dependencies='"psutil"'))
+    assert error.startswith("ModuleNotFoundError: 'rich'")
+
+
+def test_undeclared_import_is_reported():
+    error = validator.validate(script("import requests\n"))
+    assert error.startswith("ModuleNotFoundError: 'requests' is imported on line 4")
+
+
+def test_requirement_names_map_to_import_names():
+    assert validator.validate(script("import yaml\nimport bs4\n", dependencies='"PyYAML>=6", "beautifulsoup4"')) is None
+
+
+@pytest.mark.parametrize("body", [
+    "try:\n    import GPUtil\nexcept ImportError:\n    GPUtil = None\n",
+    "try:\n    import GPUtil\nexcept:\n    GPUtil = None\n",
+    "def gpus():\n    import GPUtil\n    return GPUtil.getGPUs()\n",
+])
+def test_optional_and_nested_imports_are_not_checked(body):
+    assert validator.validate(script(body)) is None
+
+
+def test_imports_in_a_try_that_doesnt_handle_import_error_are_checked():
+    error = validator.validate(script("try:\n    import GPUtil\nexcept KeyError:\n    pass\n"))
+    assert error.startswith("ModuleNotFoundError: 'GPUtil'")
+
+
+@pytest.mark.parametrize("dependencies", ['""', "3"])
+def test_bad_dependency_is_an_error_not_a_crash(dependencies):
+    error = validator.validate(script("import os\n", dependencies=dependencies))
+    assert error.startswith("Invalid dependency")